@@ -0,0 +1,46 @@
+""" Rows/s of CSV_Writer.append_lines against the buffered CSV_Appender, appending a few rows per call.
+
+    python benchmarks/append_benchmark.py --calls 20000 --rows-per-call 3
+"""
+import argparse
+import os
+import time
+
+from benchmark_utilities import temporary_directory, print_table
+from file_operations_mn.file_writers import CSV_Writer
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20_000)
+    parser.add_argument("--rows-per-call", type=int, default=3)
+    parser.add_argument("--max-rows", type=int, default=1000)
+    arguments = parser.parse_args()
+
+    lines = [[str(column) for column in range(8)] for _ in range(arguments.rows_per_call)]
+    number_of_rows = arguments.calls * arguments.rows_per_call
+
+    results = []
+    with temporary_directory() as directory:
+        csv_writer = CSV_Writer(os.path.join(directory, "append_lines.csv"), header=[str(i) for i in range(8)])
+        start = time.perf_counter()
+        for _ in range(arguments.calls):
+            csv_writer.append_lines(lines)
+        seconds = time.perf_counter() - start
+        results.append(("append_lines", f"{seconds:.3f}", f"{number_of_rows / seconds:.0f}"))
+
+        csv_writer = CSV_Writer(os.path.join(directory, "appender.csv"), header=[str(i) for i in range(8)])
+        start = time.perf_counter()
+        with csv_writer.appender(max_rows=arguments.max_rows) as appender:
+            for _ in range(arguments.calls):
+                appender.append_lines(lines)
+        seconds = time.perf_counter() - start
+        results.append((f"appender(max_rows={arguments.max_rows})", f"{seconds:.3f}",
+                        f"{number_of_rows / seconds:.0f}"))
+
+    print_table(results, ("method", "seconds", "rows/s"))
+    return None
+
+
+if __name__ == '__main__':
+    main()
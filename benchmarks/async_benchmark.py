@@ -0,0 +1,74 @@
+""" Event loop responsiveness while persisting state, blocking save() against asave().
+
+A heartbeat task sleeps 1 ms in a loop and records how late it wakes up, while --clients tasks each save
+--saves-per-client JSON documents to the same file.
+
+    python benchmarks/async_benchmark.py --clients 50 --saves-per-client 20 --keys 20000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from benchmark_utilities import temporary_directory, print_table
+from file_operations_mn.file_writers import JSON_FileReader
+
+
+async def heartbeat(lags: list, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append(time.perf_counter() - start - 0.001)
+    return None
+
+
+async def run_clients(save: callable, clients: int, saves_per_client: int, state: dict) -> tuple[list, list]:
+    lags, latencies = [], []
+    stop = asyncio.Event()
+    heartbeat_task = asyncio.create_task(heartbeat(lags, stop))
+
+    async def client() -> None:
+        for _ in range(saves_per_client):
+            start = time.perf_counter()
+            await save(state)
+            latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0)
+
+    await asyncio.gather(*(client() for _ in range(clients)))
+    stop.set()
+    await heartbeat_task
+    return lags, latencies
+
+
+def summarise(name: str, lags: list, latencies: list) -> tuple:
+    latencies = sorted(latencies)
+    return (name, f"{statistics.median(latencies) * 1e3:.2f}", f"{latencies[int(len(latencies) * 0.99)] * 1e3:.2f}",
+            f"{max(lags, default=0) * 1e3:.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--saves-per-client", type=int, default=20)
+    parser.add_argument("--keys", type=int, default=20_000)
+    arguments = parser.parse_args()
+
+    state = {f"key_{i}": [i, str(i), i * 0.5] for i in range(arguments.keys)}
+    results = []
+    with temporary_directory() as directory:
+        json_reader = JSON_FileReader(os.path.join(directory, "state.json"))
+
+        async def blocking_save(data: dict) -> None:
+            json_reader.save(data)
+
+        for name, save in (("save (blocking)", blocking_save), ("asave", json_reader.asave)):
+            lags, latencies = asyncio.run(run_clients(save, arguments.clients, arguments.saves_per_client, state))
+            results.append(summarise(name, lags, latencies))
+
+    print_table(results, ("method", "p50 save ms", "p99 save ms", "max loop lag ms"))
+    return None
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+""" Latency of JSON_FileReader.save for each atomic/durability combination.
+
+    python benchmarks/atomic_save_benchmark.py --keys 1000 --saves 200
+
+Set BENCH_DIR to benchmark a specific filesystem, fsync costs vary hugely between disks.
+"""
+import argparse
+import os
+import statistics
+import time
+
+from benchmark_utilities import temporary_directory, print_table
+from file_operations_mn.file_writers import JSON_FileReader
+from file_operations_mn.file_utilities_write import DURABILITY_LEVELS
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keys", type=int, default=1000)
+    parser.add_argument("--saves", type=int, default=200)
+    arguments = parser.parse_args()
+
+    state = {f"key_{i}": [i, str(i)] for i in range(arguments.keys)}
+    results = []
+    with temporary_directory() as directory:
+        for atomic in (False, True):
+            for durability in DURABILITY_LEVELS:
+                json_reader = JSON_FileReader(os.path.join(directory, "state.json"), atomic=atomic,
+                                              durability=durability)
+                latencies = []
+                for _ in range(arguments.saves):
+                    start = time.perf_counter()
+                    json_reader.save(state)
+                    latencies.append(time.perf_counter() - start)
+                latencies.sort()
+                results.append((atomic, durability, f"{statistics.median(latencies) * 1e3:.3f}",
+                                f"{latencies[int(len(latencies) * 0.99)] * 1e3:.3f}"))
+
+    print_table(results, ("atomic", "durability", "p50 ms", "p99 ms"))
+    return None
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+""" Epoch throughput of CSV_BatchSampler (shuffled) against CSV_Writer.load_sequential (in order).
+
+    python benchmarks/batch_sampler_benchmark.py --rows 1000000 --batch-size 256
+"""
+import argparse
+import contextlib
+import io
+import os
+import time
+
+from benchmark_utilities import make_csv_with_rows, temporary_directory, print_table
+from file_operations_mn.file_writers import CSV_Writer
+from file_operations_mn.csv_sampler import CSV_BatchSampler
+
+
+def time_epoch(iterate_epoch: callable, number_of_rows: int) -> tuple[str, str]:
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        iterate_epoch()
+    seconds = time.perf_counter() - start
+    return f"{seconds:.3f}", f"{number_of_rows / seconds:.0f}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=256)
+    arguments = parser.parse_args()
+
+    number_of_batches = arguments.rows // arguments.batch_size
+    with temporary_directory() as directory:
+        file_path = os.path.join(directory, "rows.csv")
+        make_csv_with_rows(file_path, arguments.rows)
+
+        def sequential_epoch() -> None:
+            with CSV_Writer(file_path) as csv_writer:
+                for _ in range(number_of_batches):
+                    csv_writer.load_sequential(arguments.batch_size)
+
+        def sampler_epoch() -> None:
+            sampler = CSV_BatchSampler(CSV_Writer(file_path), arguments.batch_size, seed=0, drop_last=True)
+            for _ in sampler:
+                pass
+
+        results = [("load_sequential", *time_epoch(sequential_epoch, arguments.rows)),
+                   ("CSV_BatchSampler", *time_epoch(sampler_epoch, arguments.rows))]
+
+    print_table(results, ("reader", "seconds/epoch", "rows/s"))
+    return None
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+""" Small stdlib-only helpers shared by the benchmark scripts.
+
+Run the scripts from the repository root with the package installed (or PYTHONPATH=src), e.g.
+    python benchmarks/count_file_lines_benchmark.py --sizes 10MB
+"""
+import os
+import tempfile
+import time
+
+
+SIZE_SUFFIXES = {"KB": 1 << 10, "MB": 1 << 20, "GB": 1 << 30}
+
+
+def parse_size(size: str) -> int:
+    """ '10MB' -> 10485760"""
+    size = size.strip().upper()
+    for suffix, multiplier in SIZE_SUFFIXES.items():
+        if size.endswith(suffix):
+            return int(float(size[:-len(suffix)]) * multiplier)
+    return int(size)
+
+
+def best_time(func: callable, repeats: int = 3) -> float:
+    """ Best wall-clock time in seconds over repeats calls"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def make_csv_of_size(file_path: str, size_bytes: int, columns: int = 4, delimiter: str = '|') -> int:
+    """ Writes numeric rows until the file is at least size_bytes, returns the number of rows"""
+    row = delimiter.join(str(float(column)) for column in range(columns)) + '\n'
+    rows_per_block = max(1, (1 << 20) // len(row))
+    block = row * rows_per_block
+    number_of_rows = 0
+    with open(file_path, 'w') as file:
+        while number_of_rows * len(row) < size_bytes:
+            file.write(block)
+            number_of_rows += rows_per_block
+    return number_of_rows
+
+
+def make_csv_with_rows(file_path: str, number_of_rows: int, columns: int = 4, delimiter: str = '|') -> None:
+    rows_per_block = 10_000
+    with open(file_path, 'w') as file:
+        for block_start in range(0, number_of_rows, rows_per_block):
+            block_end = min(block_start + rows_per_block, number_of_rows)
+            file.writelines(delimiter.join(str(float(i + column)) for column in range(columns)) + '\n'
+                            for i in range(block_start, block_end))
+    return None
+
+
+def temporary_directory() -> tempfile.TemporaryDirectory:
+    return tempfile.TemporaryDirectory(prefix="file_operations_mn_bench_", dir=os.environ.get("BENCH_DIR"))
+
+
+def print_table(rows: list[tuple], header: tuple) -> None:
+    widths = [max(len(str(value)) for value in column) for column in zip(header, *rows)]
+    for row in (header, *rows):
+        print("  ".join(str(value).ljust(width) for value, width in zip(row, widths)))
+    return None
@@ -0,0 +1,43 @@
+""" CPU/IO tradeoff of each compression codec on the same CSV: compression ratio, save time, streaming read time
+and count_file_lines time.
+
+    python benchmarks/codec_benchmark.py --size 50MB
+
+Set BENCH_DIR to benchmark a specific filesystem, slow disks favour the smaller compressed files.
+"""
+import argparse
+import os
+
+from benchmark_utilities import parse_size, best_time, make_csv_of_size, temporary_directory, print_table
+from file_operations_mn.file_writers import CSV_Writer
+from file_operations_mn.file_utilities_read import count_file_lines
+from file_operations_mn.file_compression import COMPRESSION_OPENERS
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", default="50MB")
+    parser.add_argument("--repeats", type=int, default=3)
+    arguments = parser.parse_args()
+
+    results = []
+    with temporary_directory() as directory:
+        plain_path = os.path.join(directory, "data.csv")
+        make_csv_of_size(plain_path, parse_size(arguments.size))
+        rows = CSV_Writer(plain_path).load_all()
+        plain_size = os.path.getsize(plain_path)
+
+        for suffix in ("", *COMPRESSION_OPENERS):
+            csv_writer = CSV_Writer(plain_path + suffix)
+            save_seconds = best_time(lambda: csv_writer.save(rows), arguments.repeats)
+            read_seconds = best_time(lambda: sum(1 for _ in csv_writer.iter_rows()), arguments.repeats)
+            count_seconds = best_time(lambda: count_file_lines(csv_writer.file_path), arguments.repeats)
+            results.append((suffix or "none", f"{plain_size / os.path.getsize(csv_writer.file_path):.2f}x",
+                            f"{save_seconds:.3f}", f"{read_seconds:.3f}", f"{count_seconds:.3f}"))
+
+    print_table(results, ("codec", "ratio", "save s", "iter_rows s", "count_file_lines s"))
+    return None
+
+
+if __name__ == '__main__':
+    main()
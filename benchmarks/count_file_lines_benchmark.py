@@ -0,0 +1,55 @@
+""" Compares the count_file_lines strategies.
+
+    python benchmarks/count_file_lines_benchmark.py --sizes 10MB,1GB,10GB --workers 8
+
+The 1 GB and 10 GB files need that much free disk space, set BENCH_DIR to choose where they go.
+"""
+import argparse
+import os
+
+from benchmark_utilities import parse_size, best_time, make_csv_of_size, temporary_directory, print_table
+from file_operations_mn.file_utilities_read import count_file_lines, COUNT_STRATEGIES
+
+
+def legacy_count_file_lines(file_path: str) -> int:
+    """ The original full text read + per character loop, for reference"""
+    with open(file_path, "r") as file:
+        data = file.read()
+
+    if len(data) == 0:
+        return 1
+
+    return sum(1 for line in data if line[-1] == '\n') + 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10MB,1GB,10GB")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--legacy-limit", default="1GB", help="Skip the legacy reader above this size")
+    arguments = parser.parse_args()
+
+    results = []
+    with temporary_directory() as directory:
+        for size in arguments.sizes.split(','):
+            file_path = os.path.join(directory, f"{size}.csv")
+            make_csv_of_size(file_path, parse_size(size))
+            size_mb = os.path.getsize(file_path) / (1 << 20)
+
+            if parse_size(size) <= parse_size(arguments.legacy_limit):
+                seconds = best_time(lambda: legacy_count_file_lines(file_path), arguments.repeats)
+                results.append((size, "legacy", f"{seconds:.4f}", f"{size_mb / seconds:.0f}"))
+
+            for strategy in COUNT_STRATEGIES:
+                seconds = best_time(lambda: count_file_lines(file_path, strategy=strategy, workers=arguments.workers),
+                                    arguments.repeats)
+                results.append((size, strategy, f"{seconds:.4f}", f"{size_mb / seconds:.0f}"))
+            os.remove(file_path)
+
+    print_table(results, ("size", "strategy", "seconds", "MB/s"))
+    return None
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+""" Finding the next numbered output file in a big directory: the original os.listdir scan, the os.scandir scan,
+and a DirectoryIndex.
+
+    python benchmarks/directory_index_benchmark.py --files 500000 --creates 100
+
+Set BENCH_DIR to benchmark a specific filesystem.
+"""
+import argparse
+import os
+import time
+
+from benchmark_utilities import best_time, temporary_directory, print_table
+from file_operations_mn.directory_index import DirectoryIndex
+from file_operations_mn.file_utilities_read import max_file_index_in_dir
+from file_operations_mn.path_string_utilities import is_path_of_extension, file_path_without_extension
+
+
+def legacy_max_file_index_in_dir(directory_path: str, extension_type: str = '.txt') -> int:
+    """ The original os.listdir implementation, for reference"""
+    file_names = [file_path_without_extension(file_path) for file_path in os.listdir(directory_path)
+                  if is_path_of_extension(file_path, extension=extension_type)]
+    file_names = [int(file_name) for file_name in file_names if file_name.isnumeric()]
+    return max(file_names) if file_names else 0
+
+
+def create_files(directory_path: str, creates: int, next_index: callable) -> float:
+    """ Seconds per created file, asking next_index() for the index before each create"""
+    start = time.perf_counter()
+    for _ in range(creates):
+        open(os.path.join(directory_path, f"{next_index() + 1}.txt"), 'x').close()
+    return (time.perf_counter() - start) / creates
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=500_000)
+    parser.add_argument("--creates", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=3)
+    arguments = parser.parse_args()
+
+    results = []
+    with temporary_directory() as directory_path:
+        for index in range(arguments.files):
+            open(os.path.join(directory_path, f"{index}.txt"), 'w').close()
+
+        for name, scanner in (("listdir (original)", legacy_max_file_index_in_dir),
+                              ("max_file_index_in_dir", max_file_index_in_dir)):
+            scan_seconds = best_time(lambda: scanner(directory_path), arguments.repeats)
+            create_seconds = create_files(directory_path, arguments.creates, lambda: scanner(directory_path))
+            results.append((name, f"{scan_seconds:.6f}", f"{create_seconds:.6f}"))
+
+        directory_index = DirectoryIndex(directory_path)
+        directory_index.refresh()
+
+        def create_next_files() -> float:
+            start = time.perf_counter()
+            for _ in range(arguments.creates):
+                directory_index.create_next_file()
+            return (time.perf_counter() - start) / arguments.creates
+        results.append(("DirectoryIndex", f"{best_time(directory_index.max_index, arguments.repeats):.6f}",
+                        f"{create_next_files():.6f}"))
+
+    print_table(results, ("scanner", "max index s", "s per next file"))
+    return None
+
+
+if __name__ == '__main__':
+    main()
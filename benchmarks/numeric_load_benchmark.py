@@ -0,0 +1,54 @@
+""" Memory and time of CSV_Writer.load_numeric against load_all(as_float=True) on a numeric-only file.
+
+    python benchmarks/numeric_load_benchmark.py --rows 1000000 --columns 8
+"""
+import argparse
+import contextlib
+import io
+import os
+import time
+import tracemalloc
+
+from benchmark_utilities import make_csv_with_rows, temporary_directory, print_table
+from file_operations_mn.file_writers import CSV_Writer
+
+
+def measure(load: callable) -> tuple[float, int, int]:
+    """ (seconds, bytes held by the result, peak traced bytes). Timed separately, tracemalloc slows loading"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        load()
+        seconds = time.perf_counter() - start
+
+        tracemalloc.start()
+        result = load()
+        held, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    del result
+    return seconds, held, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--columns", type=int, default=8)
+    arguments = parser.parse_args()
+
+    with temporary_directory() as directory:
+        file_path = os.path.join(directory, "numeric.csv")
+        make_csv_with_rows(file_path, arguments.rows, columns=arguments.columns)
+        csv_writer = CSV_Writer(file_path)
+
+        results = []
+        for name, load in (("load_all(as_float=True)", lambda: csv_writer.load_all(as_float=True)),
+                           ("load_numeric", csv_writer.load_numeric),
+                           ("load_numeric_columns", csv_writer.load_numeric_columns)):
+            seconds, held, peak = measure(load)
+            results.append((name, f"{seconds:.3f}", f"{held / (1 << 20):.1f}", f"{peak / (1 << 20):.1f}"))
+
+    print_table(results, ("loader", "seconds", "result MB", "peak MB"))
+    return None
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+""" Scaling of CSV_Writer.load_all(workers=N) from 1 to N worker processes.
+
+    python benchmarks/parallel_load_benchmark.py --size 1GB --max-workers 32
+"""
+import argparse
+import contextlib
+import io
+import os
+
+from benchmark_utilities import parse_size, best_time, make_csv_of_size, temporary_directory, print_table
+from file_operations_mn.file_writers import CSV_Writer, PARALLEL_LOAD_CHUNK_SIZE
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", default="256MB")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-size", default=str(PARALLEL_LOAD_CHUNK_SIZE))
+    parser.add_argument("--repeats", type=int, default=1)
+    arguments = parser.parse_args()
+
+    worker_counts = sorted({1, *(2 ** power for power in range(8) if 2 ** power <= arguments.max_workers),
+                            arguments.max_workers})
+    results = []
+    with temporary_directory() as directory:
+        file_path = os.path.join(directory, "parallel.csv")
+        make_csv_of_size(file_path, parse_size(arguments.size))
+        csv_writer = CSV_Writer(file_path)
+
+        baseline = None
+        for workers in worker_counts:
+            with contextlib.redirect_stdout(io.StringIO()):
+                seconds = best_time(lambda: csv_writer.load_all(workers=workers,
+                                                                chunk_size=parse_size(arguments.chunk_size)),
+                                    arguments.repeats)
+            baseline = baseline or seconds
+            results.append((workers, f"{seconds:.3f}", f"{baseline / seconds:.2f}x"))
+
+    print_table(results, ("workers", "seconds", "speedup"))
+    return None
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+""" path_string_utilities against the original character-by-character loops: uncached per call, in batches, and
+through the LRU cache on a working set of --unique-paths paths.
+Also checks that both give identical results (or both raise InvalidPathError) on random paths.
+
+    python benchmarks/path_string_benchmark.py --paths 100000
+"""
+import argparse
+import random
+
+from benchmark_utilities import best_time, print_table
+from file_operations_mn.file_exceptions import InvalidPathError
+from file_operations_mn.path_string_utilities import (file_path_extension, file_path_without_extension, parent_path,
+                                                      path_parent_dir_only_parent, file_path_extensions,
+                                                      file_paths_without_extension, parent_paths)
+
+
+def legacy_file_path_without_extension(file_path: str) -> str:
+    if '.' not in file_path or file_path[-1] == '.' or file_path[-2] == '.':
+        raise InvalidPathError(file_path)
+
+    stop_index = 0
+    for i, character in enumerate(reversed(file_path)):
+        if character == '.':
+            stop_index = i + 1
+            break
+
+    return file_path[:-stop_index]
+
+
+def legacy_file_path_extension(file_path: str) -> str:
+    dot_index = -1
+    for index in range(len(file_path) - 1, -1, -1):
+        if file_path[index] == '.':
+            dot_index = index
+            break
+    if dot_index != -1:
+        return file_path[dot_index:]
+    raise InvalidPathError(file_path)
+
+
+def legacy_parent_path(path: str, parent_num: int = 1) -> str:
+    if len(path) <= 1:
+        raise InvalidPathError(path)
+
+    parent_path_start = 0
+
+    for i, char in enumerate(reversed(path)):
+        if char == '/' or char == '\\':
+            parent_path_start = i + 1
+            break
+
+    parent_path_str = path
+    if parent_path_start != 0:
+        parent_path_str = path[:-parent_path_start]
+
+    if parent_num > 1:
+        return legacy_parent_path(parent_path_str, parent_num - 1)
+
+    return parent_path_str
+
+
+def legacy_path_parent_dir_only_parent(path: str) -> str:
+    if len(path) <= 1:
+        raise InvalidPathError(path)
+
+    start = 0
+    end = 0
+    for i, char in enumerate(reversed(path)):
+        if char == '/' or char == '\\':
+            if start != 0:
+                end = i
+                break
+            start = i + 1
+
+    parent_path_str = path
+    if end != 0:
+        parent_path_str = path[-end:-start]
+    return parent_path_str
+
+
+def random_path(rng: random.Random) -> str:
+    return ''.join(rng.choice("ab./\\") for _ in range(rng.randint(0, 8)))
+
+
+def realistic_path(rng: random.Random) -> str:
+    directories = '/'.join(f"directory_{rng.randint(0, 99)}" for _ in range(rng.randint(1, 6)))
+    return f"/data/{directories}/file_{rng.randint(0, 10 ** 6)}.{rng.choice(('csv', 'txt', 'json'))}"
+
+
+def outcome(func: callable, *args):
+    try:
+        return func(*args)
+    except InvalidPathError:
+        return InvalidPathError
+
+
+def check_identical(rng: random.Random, number_of_paths: int) -> None:
+    pairs = ((legacy_file_path_extension, file_path_extension),
+             (legacy_file_path_without_extension, file_path_without_extension),
+             (legacy_path_parent_dir_only_parent, path_parent_dir_only_parent))
+    for path in (random_path(rng) for _ in range(number_of_paths)):
+        for legacy, current in pairs:
+            assert outcome(legacy, path) == outcome(current, path), (legacy.__name__, path)
+        for parent_num in range(4):
+            assert outcome(legacy_parent_path, path, parent_num) == outcome(parent_path, path, parent_num), path
+    return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paths", type=int, default=100_000)
+    parser.add_argument("--unique-paths", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=3)
+    arguments = parser.parse_args()
+
+    rng = random.Random(0)
+    check_identical(rng, arguments.paths)
+    paths = [realistic_path(rng) for _ in range(arguments.paths)]
+    repeated_paths = [paths[index % arguments.unique_paths] for index in range(arguments.paths)]
+
+    cases = (("file_path_extension", legacy_file_path_extension, file_path_extension, file_path_extensions),
+             ("file_path_without_extension", legacy_file_path_without_extension, file_path_without_extension,
+              file_paths_without_extension),
+             ("parent_path", legacy_parent_path, parent_path, parent_paths),
+             ("path_parent_dir_only_parent", legacy_path_parent_dir_only_parent, path_parent_dir_only_parent, None))
+    results = []
+    for name, legacy, cached, batch in cases:
+        uncached = cached.__wrapped__
+        legacy_seconds = best_time(lambda: [legacy(path) for path in paths], arguments.repeats)
+        uncached_seconds = best_time(lambda: [uncached(path) for path in paths], arguments.repeats)
+        batch_seconds = best_time(lambda: batch(paths), arguments.repeats) if batch is not None else None
+        cached_seconds = best_time(lambda: [cached(path) for path in repeated_paths], arguments.repeats)
+        results.append((name, f"{legacy_seconds:.4f}", f"{uncached_seconds:.4f}",
+                        "-" if batch_seconds is None else f"{batch_seconds:.4f}", f"{cached_seconds:.4f}",
+                        f"{legacy_seconds / min(uncached_seconds, batch_seconds or uncached_seconds):.1f}x"))
+
+    print_table(results, ("function", "original s", "rfind s", "batch s", "cached (repeated) s", "rfind speedup"))
+    return None
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+""" Single-key update latency and write amplification of JSON_StateStore against JSON_FileReader.save.
+
+    python benchmarks/state_store_benchmark.py --keys 10000 --updates 500
+
+Write amplification is the bytes written to disk per update divided by the bytes of the update record itself.
+Set BENCH_DIR to benchmark a specific filesystem.
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+from benchmark_utilities import temporary_directory, print_table
+from file_operations_mn.file_writers import JSON_FileReader
+from file_operations_mn.json_state_store import JSON_StateStore, COMPACT_THRESHOLD_BYTES
+
+
+def measure(update: callable, updates: int, directory: str) -> tuple[float, float, int]:
+    """ Returns (p50 seconds, p99 seconds, total bytes written). A file with a new inode (an atomic replace)
+    counts as fully written, otherwise only its growth counts"""
+    latencies = []
+    bytes_written = 0
+    for i in range(updates):
+        files_before = {entry.name: (entry.inode(), entry.stat().st_size) for entry in os.scandir(directory)}
+        start = time.perf_counter()
+        update(i)
+        latencies.append(time.perf_counter() - start)
+        for entry in os.scandir(directory):
+            inode, size = entry.inode(), entry.stat().st_size
+            inode_before, size_before = files_before.get(entry.name, (None, 0))
+            bytes_written += size if inode != inode_before else max(size - size_before, 0)
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.99)], bytes_written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keys", type=int, default=10_000)
+    parser.add_argument("--updates", type=int, default=500)
+    parser.add_argument("--compact-threshold", type=int, default=COMPACT_THRESHOLD_BYTES)
+    arguments = parser.parse_args()
+
+    state = {f"key_{i}": [i, str(i)] for i in range(arguments.keys)}
+    record_bytes = len(json.dumps({"op": "set", "key": "key_0", "value": [0, "0"]}, separators=(',', ':')))
+    results = []
+    for durability in ("none", "file"):
+        with temporary_directory() as directory:
+            json_reader = JSON_FileReader(os.path.join(directory, "state.json"), compact=True, atomic=True,
+                                          durability=durability)
+            json_reader.save(state)
+
+            def full_save(i: int) -> None:
+                state[f"key_{i % arguments.keys}"] = [i, str(i)]
+                json_reader.save(state)
+                return None
+            results.append(("JSON_FileReader.save", durability, *measure(full_save, arguments.updates, directory)))
+
+        with temporary_directory() as directory:
+            store = JSON_StateStore(os.path.join(directory, "state.json"), durability=durability,
+                                    compact_threshold_bytes=arguments.compact_threshold, compact=True)
+            store.update(state)
+            store.compact()
+
+            def logged_update(i: int) -> None:
+                store[f"key_{i % arguments.keys}"] = [i, str(i)]
+                return None
+            results.append(("JSON_StateStore", durability, *measure(logged_update, arguments.updates, directory)))
+
+    print_table([(name, durability, f"{p50 * 1e3:.3f}", f"{p99 * 1e3:.3f}",
+                  f"{bytes_written / arguments.updates / record_bytes:.1f}x")
+                 for name, durability, p50, p99, bytes_written in results],
+                ("writer", "durability", "p50 ms", "p99 ms", "write amplification"))
+    return None
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+""" Reproducible benchmark suite for the file_operations_mn hot paths, with JSON output and regression checks.
+
+Run the suite and save the results:
+    python benchmarks/suite.py --preset quick --output before.json
+    python benchmarks/suite.py --preset full --shapes narrow,wide --output after.json
+
+Compare two runs, exits with status 1 if any case got slower by more than the threshold:
+    python benchmarks/suite.py --compare before.json after.json --threshold 0.10
+
+Presets: quick = 1K and 1M rows, full = 1K, 1M and 50M rows. Shapes: narrow = 4 columns, wide = 64 columns.
+The 50M row files need tens of GB of free disk space, set BENCH_DIR to choose where they go.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import time
+
+from benchmark_utilities import best_time, make_csv_with_rows, temporary_directory, print_table
+from file_operations_mn.file_utilities_read import (count_file_lines, files_in_dir, max_file_index_in_dir,
+                                                    immediate_subdirs)
+from file_operations_mn.file_writers import CSV_Writer, JSON_FileReader
+
+
+PRESETS = {"quick": "1K,1M", "full": "1K,1M,50M"}
+SHAPES = {"narrow": 4, "wide": 64}
+ROW_SUFFIXES = {"K": 1_000, "M": 1_000_000}
+MAX_LOAD_ALL_ROWS = 1_000_000
+MAX_DIRECTORY_FILES = 10_000
+MAX_JSON_KEYS = 100_000
+
+
+def parse_rows(rows: str) -> int:
+    """ '50M' -> 50000000"""
+    rows = rows.strip().upper()
+    if rows[-1] in ROW_SUFFIXES:
+        return int(float(rows[:-1]) * ROW_SUFFIXES[rows[-1]])
+    return int(rows)
+
+
+def csv_cases(file_path: str, number_of_rows: int) -> dict:
+    """ name -> zero argument callable, every case leaves the file as it found it"""
+    csv_writer = CSV_Writer(file_path)
+    random_rows = random.Random(0).sample(range(number_of_rows), min(100, number_of_rows))
+    range_start = number_of_rows // 2
+    range_end = min(range_start + 1000, number_of_rows)
+    batch_size = min(256, number_of_rows)
+    last_line = csv_writer.load_line(number_of_rows - 1)
+
+    def load_sequential() -> None:
+        with CSV_Writer(file_path) as sequential_writer:
+            for _ in range(100):
+                sequential_writer.load_sequential(batch_size)
+
+    def append_then_remove() -> None:
+        for _ in range(100):
+            csv_writer.append_lines(last_line * 3)
+        csv_writer.remove_last_lines(300)
+
+    def remove_then_append() -> None:
+        for _ in range(100):
+            csv_writer.remove_last_line()
+            csv_writer.append_lines(last_line)
+
+    cases = {
+        "count_file_lines": lambda: count_file_lines(file_path),
+        "len": lambda: len(CSV_Writer(file_path)),
+        "load_line_x100": lambda: [csv_writer.load_line(row) for row in random_rows],
+        "load_range_1000": lambda: csv_writer.load_range(range_start, range_end),
+        "load_sequential_100_batches": load_sequential,
+        "append_lines_x100_then_remove_last_lines": append_then_remove,
+        "remove_last_line_then_append_x100": remove_then_append,
+    }
+    if number_of_rows <= MAX_LOAD_ALL_ROWS:
+        cases["load_all"] = csv_writer.load_all
+    return cases
+
+
+def json_cases(file_path: str, number_of_keys: int) -> dict:
+    json_reader = JSON_FileReader(file_path)
+    state = {f"key_{i}": [i, str(i), i * 0.5] for i in range(number_of_keys)}
+    json_reader.save(state)
+    return {"json_save": lambda: json_reader.save(state), "json_load": json_reader.load}
+
+
+def directory_cases(directory_path: str, number_of_files: int) -> dict:
+    os.makedirs(directory_path)
+    for index in range(number_of_files):
+        open(os.path.join(directory_path, f"{index}.txt"), 'w').close()
+    for index in range(10):
+        os.makedirs(os.path.join(directory_path, f"sub_dir{index}"))
+    return {"files_in_dir": lambda: files_in_dir(directory_path),
+            "max_file_index_in_dir": lambda: max_file_index_in_dir(directory_path),
+            "immediate_subdirs": lambda: immediate_subdirs(directory_path)}
+
+
+def run_suite(sizes: list[str], shapes: list[str], repeats: int) -> dict:
+    results = {}
+
+    def run_case(name: str, case: callable) -> None:
+        results[name] = best_time(case, repeats)
+        print(f"{name}: {results[name]:.6f}s", file=sys.stderr)
+
+    with temporary_directory() as directory:
+        for size in sizes:
+            number_of_rows = parse_rows(size)
+            for shape in shapes:
+                file_path = os.path.join(directory, f"{size}_{shape}.csv")
+                make_csv_with_rows(file_path, number_of_rows, columns=SHAPES[shape])
+                for name, case in csv_cases(file_path, number_of_rows).items():
+                    run_case(f"csv/{size}/{shape}/{name}", case)
+                os.remove(file_path)
+
+            number_of_keys = min(number_of_rows, MAX_JSON_KEYS)
+            for name, case in json_cases(os.path.join(directory, f"{size}.json"), number_of_keys).items():
+                run_case(f"json/{size}/{name}", case)
+
+            directory_path = os.path.join(directory, f"dir_{size}")
+            for name, case in directory_cases(directory_path, min(number_of_rows, MAX_DIRECTORY_FILES)).items():
+                run_case(f"directory/{size}/{name}", case)
+            shutil.rmtree(directory_path)
+
+    return {"meta": {"python": platform.python_version(), "platform": platform.platform(),
+                     "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "repeats": repeats,
+                     "sizes": sizes, "shapes": shapes},
+            "results": {name: {"seconds": seconds} for name, seconds in results.items()}}
+
+
+def compare(old_path: str, new_path: str, threshold: float) -> bool:
+    """ Prints old/new timings per case, returns True if any case regressed by more than threshold"""
+    with open(old_path, 'r') as file:
+        old_results = json.load(file)["results"]
+    with open(new_path, 'r') as file:
+        new_results = json.load(file)["results"]
+
+    rows = []
+    regressed = False
+    for name in sorted(old_results.keys() & new_results.keys()):
+        old_seconds = old_results[name]["seconds"]
+        new_seconds = new_results[name]["seconds"]
+        ratio = new_seconds / old_seconds if old_seconds > 0 else float("inf")
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "REGRESSION"
+            regressed = True
+        elif ratio < 1 - threshold:
+            flag = "faster"
+        rows.append((name, f"{old_seconds:.6f}", f"{new_seconds:.6f}", f"{ratio:.2f}x", flag))
+
+    print_table(rows, ("case", "old s", "new s", "new/old", ""))
+    for name in sorted(old_results.keys() ^ new_results.keys()):
+        print(f"Only in one run: {name}")
+    return regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--preset", choices=PRESETS, default="quick")
+    parser.add_argument("--sizes", help="Comma separated row counts, e.g. 1K,1M. Overrides --preset")
+    parser.add_argument("--shapes", default="narrow", help=f"Comma separated, from {tuple(SHAPES)}")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", help="Write the JSON results here instead of stdout")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown before flagging, 0.1 = 10%%")
+    arguments = parser.parse_args()
+
+    if arguments.compare:
+        sys.exit(1 if compare(*arguments.compare, arguments.threshold) else 0)
+
+    sizes = (arguments.sizes or PRESETS[arguments.preset]).split(',')
+    results = run_suite(sizes, arguments.shapes.split(','), arguments.repeats)
+    if arguments.output is None:
+        print(json.dumps(results, indent=4))
+        return None
+
+    with open(arguments.output, 'w') as file:
+        json.dump(results, file, indent=4)
+    return None
+
+
+if __name__ == '__main__':
+    main()
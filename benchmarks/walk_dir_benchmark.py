@@ -0,0 +1,72 @@
+""" immediate_subdirs, walk_dir and discover_files on a synthetic deep tree, against the original os.walk based
+versions.
+
+    python benchmarks/walk_dir_benchmark.py --depth 4 --fanout 6 --files 20 --workers 1,4,16
+
+The tree has fanout ** depth leaf directories with --files files in every directory. Set BENCH_DIR to benchmark a
+network or NVMe filesystem, where the thread pool fan-out pays off.
+"""
+import argparse
+import os
+
+from benchmark_utilities import best_time, temporary_directory, print_table
+from file_operations_mn.file_utilities_read import immediate_subdirs, walk_dir, discover_files
+
+
+def legacy_immediate_subdirs(dir_path: str) -> list[str]:
+    """ The original implementation, for reference"""
+    return tuple(os.walk(dir_path))[0][1]
+
+
+def make_tree(dir_path: str, depth: int, fanout: int, files: int) -> int:
+    """ Returns the number of files made"""
+    for index in range(files):
+        open(os.path.join(dir_path, f"{index}.csv" if index % 2 else f"{index}.txt"), 'w').close()
+    if depth == 0:
+        return files
+
+    number_of_files = files
+    for index in range(fanout):
+        subdir_path = os.path.join(dir_path, f"sub_dir{index}")
+        os.mkdir(subdir_path)
+        number_of_files += make_tree(subdir_path, depth - 1, fanout, files)
+    return number_of_files
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--fanout", type=int, default=6)
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--workers", default="1,4,16")
+    parser.add_argument("--repeats", type=int, default=3)
+    arguments = parser.parse_args()
+
+    results = []
+    with temporary_directory() as directory_path:
+        number_of_files = make_tree(directory_path, arguments.depth, arguments.fanout, arguments.files)
+        print(f"{number_of_files} files")
+
+        results.append(("immediate_subdirs (os.walk)",
+                        best_time(lambda: legacy_immediate_subdirs(directory_path), arguments.repeats)))
+        results.append(("immediate_subdirs", best_time(lambda: immediate_subdirs(directory_path), arguments.repeats)))
+        results.append(("os.walk", best_time(lambda: sum(len(files) for _, _, files in os.walk(directory_path)),
+                                             arguments.repeats)))
+        for workers in map(int, arguments.workers.split(',')):
+            results.append((f"walk_dir workers={workers}",
+                            best_time(lambda: sum(1 for _ in walk_dir(directory_path, workers=workers)),
+                                      arguments.repeats)))
+            results.append((f"walk_dir workers={workers} .csv max_depth=2",
+                            best_time(lambda: sum(1 for _ in walk_dir(directory_path, max_depth=2, extension=".csv",
+                                                                      workers=workers)), arguments.repeats)))
+            results.append((f"discover_files workers={workers} .csv min_size=0",
+                            best_time(lambda: sum(1 for _ in discover_files(directory_path, extension=".csv",
+                                                                            min_size=0, workers=workers)),
+                                      arguments.repeats)))
+
+    print_table([(name, f"{seconds:.6f}") for name, seconds in results], ("case", "seconds"))
+    return None
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+
+ASYNC_MAX_WORKERS = 4
+
+_executor = None
+_pending_saves = {}
+
+
+def async_executor() -> ThreadPoolExecutor:
+    """ The bounded thread pool every FileReader a* method runs its blocking I/O on"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=ASYNC_MAX_WORKERS, thread_name_prefix="file_operations_mn")
+    return _executor
+
+
+def set_async_max_workers(max_workers: int) -> None:
+    """ Replaces the shared executor, work already submitted to the old one still finishes"""
+    global _executor, ASYNC_MAX_WORKERS
+    ASYNC_MAX_WORKERS = max_workers
+    old_executor, _executor = _executor, None
+    if old_executor is not None:
+        old_executor.shutdown(wait=False)
+    return None
+
+
+async def run_blocking(func: callable, *args, **kwargs):
+    return await asyncio.get_running_loop().run_in_executor(async_executor(), partial(func, *args, **kwargs))
+
+
+class _CoalescedSaves:
+    def __init__(self):
+        self.save = None
+        self.data = None
+        self.waiters = []
+        self.task = None
+
+
+async def coalesced_save(file_path: str, save: callable, data) -> None:
+    """ Runs save(data) on the executor. Saves to the same path that arrive while one is being written are
+    merged: only the most recent data is written next, and every merged caller returns once it is"""
+    loop = asyncio.get_running_loop()
+    key = os.path.abspath(file_path)
+    pending = _pending_saves.get(key)
+    if pending is None:
+        pending = _pending_saves[key] = _CoalescedSaves()
+
+    waiter = loop.create_future()
+    pending.save = save
+    pending.data = data
+    pending.waiters.append(waiter)
+    if pending.task is None:
+        pending.task = loop.create_task(_drain_saves(key, pending))
+
+    await waiter
+    return None
+
+
+async def _drain_saves(key: str, pending: _CoalescedSaves) -> None:
+    try:
+        while pending.waiters:
+            save, data, waiters = pending.save, pending.data, pending.waiters
+            pending.waiters = []
+            pending.data = None
+            try:
+                await run_blocking(save, data)
+            except Exception as error:
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_exception(error)
+            else:
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_result(None)
+    finally:
+        pending.task = None
+        if _pending_saves.get(key) is pending:
+            del _pending_saves[key]
+    return None
@@ -0,0 +1,63 @@
+import random
+from array import array
+from typing import Iterator
+
+from file_operations_mn.file_writers import CSV_Writer
+from file_operations_mn.file_line_index import LineOffsetIndex
+
+
+class CSV_BatchSampler:
+    """ Shuffled mini-batches from a CSV_Writer file, without loading the file into memory.
+
+    Only the byte offset of each row is held, in an array('Q') (8 bytes per row).
+    Every epoch shuffles the offsets with a seed derived from (seed, epoch), then each batch is read
+    in sorted offset order so the reads stay mostly sequential on disk.
+    """
+
+    def __init__(self, csv_writer: CSV_Writer, batch_size: int, seed: int = None, drop_last=False):
+        if batch_size < 1:
+            raise ValueError(f"Invalid batch size {batch_size}")
+
+        self.csv_writer = csv_writer
+        self.batch_size = batch_size
+        self.seed = seed
+        self.drop_last = drop_last
+        self.epoch = 0
+        self._row_offsets = self.__load_row_offsets()
+
+    def __len__(self) -> int:
+        """ Number of batches per epoch"""
+        if self.drop_last:
+            return len(self._row_offsets) // self.batch_size
+        return -(-len(self._row_offsets) // self.batch_size)
+
+    def __iter__(self) -> Iterator[list[list]]:
+        epoch = self.epoch
+        self.epoch += 1
+        return self.iter_epoch(epoch)
+
+    def iter_epoch(self, epoch: int) -> Iterator[list[list]]:
+        """ The same (seed, epoch) always gives the same batches"""
+        shuffled_offsets = array('Q', self._row_offsets)
+        random.Random(self.__epoch_seed(epoch)).shuffle(shuffled_offsets)
+
+        for batch_start in range(0, len(self) * self.batch_size, self.batch_size):
+            batch_offsets = sorted(shuffled_offsets[batch_start:batch_start + self.batch_size])
+            yield self.csv_writer.load_rows_at(batch_offsets)
+
+    def refresh(self) -> None:
+        """ Picks up rows appended to the file since the sampler was made"""
+        self._row_offsets = self.__load_row_offsets()
+        return None
+
+    def __load_row_offsets(self) -> array:
+        line_increment = 1 if self.csv_writer.header is not None else 0
+        line_index = self.csv_writer.line_index
+        if line_index is None:
+            line_index = LineOffsetIndex(self.csv_writer.file_path)
+        return line_index.offsets(line_increment)
+
+    def __epoch_seed(self, epoch: int) -> str | None:
+        if self.seed is None:
+            return None
+        return f"{self.seed}:{epoch}"
@@ -0,0 +1,89 @@
+import os
+
+from file_operations_mn.file_utilities_read import files_in_dir, numeric_file_index, max_numeric_file_index
+from file_operations_mn.path_string_utilities import assert_valid_extension
+
+
+class DirectoryIndex:
+    """ Caches the names of the files of one extension in a directory, and their max numeric index
+    (see max_file_index_in_dir), keyed on the directory mtime.
+
+    Creating, deleting or renaming an entry bumps the directory mtime, so any outside change triggers a rescan on
+    the next access. Files made with create_next_file are recorded without a rescan, so writing numbered output
+    files one after another never rescans the directory.
+    """
+
+    def __init__(self, directory_path: str, extension: str = '.txt'):
+        assert_valid_extension(extension)
+        if not os.path.isdir(directory_path):
+            raise NotADirectoryError(directory_path)
+        self.directory_path = directory_path
+        self.extension = extension
+        self._file_names = {}
+        self._max_index = 0
+        self._mtime_ns = -1
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._file_names)
+
+    def __contains__(self, file_name: str) -> bool:
+        self.refresh()
+        return file_name in self._file_names
+
+    def files(self) -> list[str]:
+        """ As files_in_dir, in scan order followed by the files recorded since"""
+        self.refresh()
+        return list(self._file_names)
+
+    def max_index(self) -> int:
+        self.refresh()
+        return self._max_index
+
+    def next_file_path(self) -> str:
+        return os.path.join(self.directory_path, f"{self.max_index() + 1}{self.extension}")
+
+    def create_next_file(self) -> str:
+        """ Creates the empty file max_index + 1, and returns its path.
+        Safe against other processes doing the same, the file is created exclusively and the next index is tried
+        if it already exists"""
+        while True:
+            file_path = self.next_file_path()
+            try:
+                with open(file_path, 'x'):
+                    pass
+            except FileExistsError:
+                self.rescan()
+                continue
+            self.add(os.path.basename(file_path))
+            return file_path
+
+    def add(self, file_name: str) -> None:
+        """ Records a file just created by our own code, without rescanning.
+        Call straight after creating the file, any other change made in between is only seen at the next change"""
+        self.__record(file_name)
+        self._mtime_ns = os.stat(self.directory_path).st_mtime_ns
+        return None
+
+    def refresh(self) -> None:
+        if os.stat(self.directory_path).st_mtime_ns != self._mtime_ns:
+            self.rescan()
+        return None
+
+    def rescan(self) -> None:
+        # Read the mtime first, so a change made during the scan triggers another rescan rather than being missed.
+        mtime_ns = os.stat(self.directory_path).st_mtime_ns
+        file_names = files_in_dir(self.directory_path, self.extension)
+        self._file_names = dict.fromkeys(file_names)
+        self._max_index = max_numeric_file_index(file_names, self.extension)
+        self._mtime_ns = mtime_ns
+        return None
+
+    def __record(self, file_name: str) -> None:
+        if not file_name.endswith(self.extension) or len(file_name) <= len(self.extension):
+            return None
+        self._file_names[file_name] = None
+        index = numeric_file_index(file_name, self.extension)
+        if index is not None and index > self._max_index:
+            self._max_index = index
+        return None
@@ -0,0 +1,47 @@
+import bz2
+import gzip
+import lzma
+import os
+
+from file_operations_mn.path_string_utilities import compression_suffix
+
+
+COMPRESSION_OPENERS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+COMPRESSORS = {".gz": gzip.compress, ".bz2": bz2.compress, ".xz": lzma.compress}
+
+
+def is_compressed(file_path: str) -> bool:
+    return compression_suffix(file_path) is not None
+
+
+def open_file(file_path: str, mode: str = 'r', **open_kwargs):
+    """ open(), transparently (de)compressing .gz, .bz2 and .xz paths with the stdlib codecs.
+
+    Text modes stay text modes. All three codecs read concatenated streams back as one, so mode 'a' appends a new
+    gzip member (or bz2/xz stream) without rewriting the file. Compressed files only seek forwards cheaply,
+    a backwards seek decompresses again from the start.
+    """
+    suffix = compression_suffix(file_path)
+    if suffix is None:
+        return open(file_path, mode, **open_kwargs)
+    if 'r' in mode and os.path.getsize(file_path) == 0:
+        # make_empty_file makes 0 byte files for every format, which bz2 and lzma refuse to read.
+        return open(file_path, mode, **open_kwargs)
+    return _open_with_codec(suffix, file_path, mode, **open_kwargs)
+
+
+def open_compressed_file_object(file_object, file_path: str, mode: str = 'w', **open_kwargs):
+    """ Wraps an already open binary file object in the codec for file_path's suffix.
+    Closing the result writes the end of the stream but leaves file_object open"""
+    return _open_with_codec(compression_suffix(file_path), file_object, mode, **open_kwargs)
+
+
+def compress_bytes(file_path: str, data: bytes) -> bytes:
+    """ data as one complete stream in the codec for file_path, ready to be appended to the file as raw bytes"""
+    return COMPRESSORS[compression_suffix(file_path)](data)
+
+
+def _open_with_codec(suffix: str, file, mode: str, **open_kwargs):
+    if 'b' not in mode and 't' not in mode:
+        mode += 't'
+    return COMPRESSION_OPENERS[suffix](file, mode, **open_kwargs)
@@ -0,0 +1,248 @@
+import os
+import zlib
+from array import array
+
+from file_operations_mn.file_utilities_read import count_newlines
+from file_operations_mn.file_compression import is_compressed
+
+
+INDEX_CHUNK_SIZE = 1 << 20
+SIDECAR_HEADER_LENGTH = 4
+PREFIX_CHECK_SIZE = 1 << 12
+
+
+def tail_checksum(file_path: str, end: int) -> int:
+    """ crc32 of the PREFIX_CHECK_SIZE bytes before end. Saved when a file is indexed, so a file that grew can be
+    checked to still start with the indexed bytes before only its new tail is scanned"""
+    start = max(0, end - PREFIX_CHECK_SIZE)
+    with open(file_path, 'rb') as file:
+        file.seek(start)
+        return zlib.crc32(file.read(end - start))
+
+
+class LineOffsetIndex:
+    """ Maps line number -> byte offset of the start of that line, for O(1) seeks.
+
+    Only lines terminated by a newline are indexed, matching count_file_lines.
+    The index assumes the file is append-only: if the file grows only the new tail is scanned, if it shrinks,
+    or grew but no longer ends its old length with the bytes that were indexed (a rewrite), the index is rebuilt.
+    With a sidecar_path the index is persisted to disk and kept in sync incrementally, so it is only
+    ever built once per file.
+    Compressed files can't be indexed, their byte offsets can't be seeked to.
+    """
+
+    def __init__(self, file_path: str, sidecar_path: str = None):
+        if is_compressed(file_path):
+            raise ValueError(f"Can't index the lines of the compressed file: \'{file_path}\'")
+        self.file_path = file_path
+        self.sidecar_path = sidecar_path
+        self._offsets = array('Q')
+        self._end = 0
+        self._size = -1
+        self._mtime_ns = -1
+        self._tail_checksum = 0
+        self._persisted_count = 0
+
+        if sidecar_path is not None:
+            self.__load_sidecar()
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._offsets)
+
+    def offset(self, line_number: int) -> int:
+        self.refresh()
+        return self._offsets[line_number]
+
+    def offsets(self, start_line: int = 0) -> array:
+        """ A copy of the offsets of every line from start_line onwards, as a compact array('Q')"""
+        self.refresh()
+        return self._offsets[start_line:]
+
+    def line_span(self, line_number: int) -> tuple[int, int]:
+        """ Returns (start, end) byte offsets of the line, end including its newline"""
+        self.refresh()
+        end = self._offsets[line_number + 1] if line_number + 1 < len(self._offsets) else self._end
+        return self._offsets[line_number], end
+
+    @property
+    def end(self) -> int:
+        """ The byte offset just past the last newline, any bytes after it are an unterminated final line"""
+        self.refresh()
+        return self._end
+
+    def refresh(self) -> None:
+        stat = os.stat(self.file_path)
+        if stat.st_size == self._size and stat.st_mtime_ns == self._mtime_ns:
+            return None
+
+        if self._size < 0 or stat.st_size <= self._size or \
+                tail_checksum(self.file_path, self._size) != self._tail_checksum:
+            self.rebuild()
+            return None
+
+        self.__scan_from(self._end)
+        self.__set_key(stat)
+        self.__sync_sidecar()
+        return None
+
+    def rebuild(self) -> None:
+        stat = os.stat(self.file_path)
+        self._offsets = array('Q')
+        self._end = 0
+        self.__scan_from(0)
+        self.__set_key(stat)
+        self._persisted_count = -1
+        self.__sync_sidecar()
+        return None
+
+    def extend(self, newlines_added: int, previous_stat: os.stat_result) -> None:
+        """ Call after appending to the file, same as refresh since the offsets of the new lines have to be scanned.
+        The arguments are only there to match LineCountCache.extend"""
+        self.refresh()
+        return None
+
+    def truncate(self, new_size: int, newlines_removed: int = None) -> None:
+        """ Call after truncating the file in place, drops every line past new_size.
+        newlines_removed is not needed, the index already knows where every line starts"""
+        while self._offsets and self._offsets[-1] >= new_size:
+            self._end = self._offsets.pop()
+        self.__set_key(os.stat(self.file_path))
+        self.__sync_sidecar()
+        return None
+
+    def __load_sidecar(self) -> None:
+        if not os.path.isfile(self.sidecar_path):
+            return None
+
+        with open(self.sidecar_path, 'rb') as file:
+            data = array('Q')
+            data.frombytes(file.read())
+
+        if len(data) < SIDECAR_HEADER_LENGTH:
+            return None
+
+        size, mtime_ns, end, checksum = data[:SIDECAR_HEADER_LENGTH]
+        # A sidecar from another version of the file, or in an older format, is ignored and rebuilt.
+        if not os.path.isfile(self.file_path) or os.path.getsize(self.file_path) < size or \
+                tail_checksum(self.file_path, size) != checksum:
+            return None
+
+        self._size, self._mtime_ns, self._end, self._tail_checksum = size, mtime_ns, end, checksum
+        self._offsets = data[SIDECAR_HEADER_LENGTH:]
+        self._persisted_count = len(self._offsets)
+        return None
+
+    def __sync_sidecar(self) -> None:
+        """ Only writes the offsets changed since the last sync, unless the index was rebuilt"""
+        if self.sidecar_path is None:
+            return None
+
+        header = array('Q', (self._size, self._mtime_ns, self._end, self._tail_checksum))
+        if self._persisted_count < 0 or not os.path.isfile(self.sidecar_path):
+            with open(self.sidecar_path, 'wb') as file:
+                header.tofile(file)
+                self._offsets.tofile(file)
+        else:
+            unchanged_count = min(self._persisted_count, len(self._offsets))
+            with open(self.sidecar_path, 'r+b') as file:
+                header.tofile(file)
+                file.seek((SIDECAR_HEADER_LENGTH + unchanged_count) * self._offsets.itemsize)
+                self._offsets[unchanged_count:].tofile(file)
+                file.truncate()
+
+        self._persisted_count = len(self._offsets)
+        return None
+
+    def __scan_from(self, start: int) -> None:
+        offsets = self._offsets
+        with open(self.file_path, 'rb') as file:
+            file.seek(start)
+            position = start
+            while True:
+                chunk = file.read(INDEX_CHUNK_SIZE)
+                if not chunk:
+                    break
+                newline_index = chunk.find(b'\n')
+                while newline_index != -1:
+                    offsets.append(self._end)
+                    self._end = position + newline_index + 1
+                    newline_index = chunk.find(b'\n', newline_index + 1)
+                position += len(chunk)
+        return None
+
+    def __set_key(self, stat: os.stat_result) -> None:
+        self._size = stat.st_size
+        self._mtime_ns = stat.st_mtime_ns
+        self._tail_checksum = tail_checksum(self.file_path, stat.st_size)
+        return None
+
+
+class LineCountCache:
+    """ Caches the number of newlines in a file, keyed on the file size and mtime.
+
+    Like LineOffsetIndex, growth is assumed to be an append, so only the new tail is counted, once the old tail
+    has been checked to be unchanged.
+    Compressed files are recounted in full on every change, the compressed tail can't be decompressed on its own.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._newline_count = 0
+        self._size = -1
+        self._mtime_ns = -1
+        self._tail_checksum = 0
+
+    def __len__(self) -> int:
+        self.refresh()
+        return self._newline_count
+
+    def refresh(self) -> None:
+        stat = os.stat(self.file_path)
+        if stat.st_size == self._size and stat.st_mtime_ns == self._mtime_ns:
+            return None
+
+        if self._size < 0 or stat.st_size <= self._size or is_compressed(self.file_path) or \
+                tail_checksum(self.file_path, self._size) != self._tail_checksum:
+            self.rebuild()
+            return None
+
+        self._newline_count += count_newlines(self.file_path, start=self._size, end=stat.st_size)
+        self.__set_key(stat)
+        return None
+
+    def rebuild(self) -> None:
+        stat = os.stat(self.file_path)
+        end = None if is_compressed(self.file_path) else stat.st_size
+        self._newline_count = count_newlines(self.file_path, end=end)
+        self.__set_key(stat)
+        return None
+
+    def extend(self, newlines_added: int, previous_stat: os.stat_result) -> None:
+        """ Call after appending newlines_added newlines to the file, previous_stat being its stat before the append.
+        Adds them without reading the file, even a compressed one. If the count wasn't up to date with
+        previous_stat, the file was changed by someone else and the count is rebuilt"""
+        if self._size != previous_stat.st_size or self._mtime_ns != previous_stat.st_mtime_ns:
+            self.rebuild()
+            return None
+
+        self._newline_count += newlines_added
+        self.__set_key(os.stat(self.file_path))
+        return None
+
+    def truncate(self, new_size: int, newlines_removed: int = None) -> None:
+        """ Call after truncating the file in place. Without newlines_removed the count is rebuilt"""
+        if newlines_removed is None or self._size < 0:
+            self.rebuild()
+            return None
+
+        self._newline_count -= newlines_removed
+        self.__set_key(os.stat(self.file_path))
+        return None
+
+    def __set_key(self, stat: os.stat_result) -> None:
+        self._size = stat.st_size
+        self._mtime_ns = stat.st_mtime_ns
+        if not is_compressed(self.file_path):
+            self._tail_checksum = tail_checksum(self.file_path, stat.st_size)
+        return None
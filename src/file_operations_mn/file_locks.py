@@ -0,0 +1,46 @@
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ModuleNotFoundError:
+    # Windows, only the in-process lock is used there.
+    fcntl = None
+
+
+_path_locks = {}
+_path_locks_guard = threading.Lock()
+
+
+def path_lock(file_path: str) -> threading.Lock:
+    """ The same threading.Lock for every caller using the same file, however the path is spelt"""
+    key = os.path.abspath(file_path)
+    with _path_locks_guard:
+        lock = _path_locks.get(key)
+        if lock is None:
+            lock = _path_locks[key] = threading.Lock()
+    return lock
+
+
+@contextmanager
+def exclusive_append_descriptor(file_path: str):
+    """ Yields an O_APPEND descriptor to file_path (created if missing), held under the in-process lock and an
+    fcntl advisory lock, so whole writes from other threads and processes can't interleave with ours"""
+    with path_lock(file_path):
+        descriptor = os.open(file_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o666)
+        try:
+            if fcntl is not None:
+                fcntl.flock(descriptor, fcntl.LOCK_EX)
+            yield descriptor
+        finally:
+            # Closing the descriptor also releases the flock.
+            os.close(descriptor)
+
+
+def write_all(descriptor: int, data: bytes) -> None:
+    """ os.write until everything is written, a single call for any normal file"""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(descriptor, view):]
+    return None
@@ -1,36 +1,145 @@
 import os
+import mmap
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Iterable, Iterator
 
-from file_operations_mn.path_string_utilities import is_path_dir, file_path_without_extension, is_path_of_extension
+from file_operations_mn.path_string_utilities import is_path_dir, assert_valid_extension
+from file_operations_mn.printing_decorators import io_event_decorator, file_size_or_none
+from file_operations_mn.file_compression import is_compressed, open_file
 
 
-def count_file_lines(file_path: str) -> int:
-    with open(file_path, "r") as file:
-        data = file.read()
+READ_CHUNK_SIZE = 1 << 20
+COUNT_STRATEGIES = ("chunked", "mmap", "parallel")
+DISCOVERY_WORKERS = 8
 
-    if len(data) == 0:
-        return 1
 
-    number_of_lines = sum(1 for line in data if line[-1] == '\n') + 1
-    return number_of_lines
+def _count_file_lines_measure(args: tuple, kwargs: dict, number_of_lines: int) -> tuple[int, int | None]:
+    return number_of_lines, file_size_or_none(args[0])
+
+
+def _count_newlines_measure(args: tuple, kwargs: dict, number_of_newlines: int) -> tuple[int, int | None]:
+    start = args[1] if len(args) > 1 else kwargs.get("start", 0)
+    end = args[2] if len(args) > 2 else kwargs.get("end")
+    end = file_size_or_none(args[0]) if end is None else end
+    return number_of_newlines, None if end is None else end - start
+
+
+@io_event_decorator(measure=_count_file_lines_measure)
+def count_file_lines(file_path: str, strategy: str = "chunked", workers: int = None,
+                     chunk_size: int = READ_CHUNK_SIZE) -> int:
+    """ Number of newlines + 1, so an empty file has 1 line. Memory use is constant for every strategy.
+
+    chunked: buffered binary reads of chunk_size.
+    mmap: memory maps the file and counts chunk_size slices. Each slice is still a bytes copy, like a read(), only
+        the read() system calls are saved.
+    parallel: splits the file into byte ranges counted by worker processes, for fast storage and big files.
+    Compressed files (.gz, .bz2, .xz) are always streamed through their codec with the chunked strategy.
+    """
+    if strategy in COUNT_STRATEGIES and is_compressed(file_path):
+        strategy = "chunked"
+
+    if strategy == "chunked":
+        number_of_newlines = count_newlines(file_path, chunk_size=chunk_size)
+    elif strategy == "mmap":
+        number_of_newlines = _count_newlines_mmap(file_path, chunk_size=chunk_size)
+    elif strategy == "parallel":
+        number_of_newlines = _count_newlines_parallel(file_path, workers=workers, chunk_size=chunk_size)
+    else:
+        raise ValueError(f"Unknown strategy: \'{strategy}\', expected one of {COUNT_STRATEGIES}")
+
+    return number_of_newlines + 1
+
+
+@io_event_decorator(measure=_count_newlines_measure)
+def count_newlines(file_path: str, start: int = 0, end: int = None, chunk_size: int = READ_CHUNK_SIZE) -> int:
+    """ Counts b'\\n' in the byte range [start, end) using fixed-size binary chunks, so memory use is constant.
+    For a compressed file the range is of the decompressed bytes"""
+    number_of_newlines = 0
+    with open_file(file_path, "rb") as file:
+        file.seek(start)
+        remaining = -1 if end is None else end - start
+        while remaining != 0:
+            chunk = file.read(chunk_size if remaining < 0 else min(chunk_size, remaining))
+            if not chunk:
+                break
+            number_of_newlines += chunk.count(b'\n')
+            if remaining > 0:
+                remaining -= len(chunk)
+    return number_of_newlines
+
+
+def _count_newlines_mmap(file_path: str, chunk_size: int = READ_CHUNK_SIZE) -> int:
+    with open(file_path, "rb") as file:
+        file_size = os.fstat(file.fileno()).st_size
+        if file_size == 0:
+            return 0
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+            return sum(mapped_file[start:start + chunk_size].count(b'\n')
+                       for start in range(0, file_size, chunk_size))
+
+
+def _count_newlines_parallel(file_path: str, workers: int = None, chunk_size: int = READ_CHUNK_SIZE) -> int:
+    file_size = os.path.getsize(file_path)
+    workers = workers or os.cpu_count() or 1
+    range_size = max(-(-file_size // workers), chunk_size)
+    starts = range(0, file_size, range_size)
+    if len(starts) <= 1:
+        return count_newlines(file_path, chunk_size=chunk_size)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        counts = executor.map(count_newlines, [file_path] * len(starts), starts,
+                              [min(start + range_size, file_size) for start in starts],
+                              [chunk_size] * len(starts))
+        return sum(counts)
+
+
+def newline_aligned_ranges(file_path: str, start: int = 0, chunk_size: int = READ_CHUNK_SIZE) -> list[tuple[int, int]]:
+    """ Splits [start, EOF) into (start, end) byte ranges of roughly chunk_size, each ending just after a newline"""
+    file_size = os.path.getsize(file_path)
+    boundaries = [start]
+    with open(file_path, "rb") as file:
+        position = start + chunk_size
+        while position < file_size:
+            file.seek(position)
+            file.readline()
+            position = file.tell()
+            if position >= file_size:
+                break
+            boundaries.append(position)
+            position += chunk_size
+    boundaries.append(file_size)
+    return [(range_start, range_end) for range_start, range_end in zip(boundaries, boundaries[1:])
+            if range_start < range_end]
 
 
 def max_file_index_in_dir(directory_path: str, extension_type: str = '.txt') -> int:
-    """ Assuming all files are named: 1.[ext] 2.[ext] ETC for any given extension, find the max number index name"""
+    """ Assuming all files are named: 1.[ext] 2.[ext] ETC for any given extension, find the max number index name.
+    Use a directory_index.DirectoryIndex to avoid rescanning big directories on every call"""
     assert is_path_dir(directory_path), NotADirectoryError(directory_path)
-    child_file_paths = os.listdir(directory_path)
-    file_names = [file_path_without_extension(file_path) for file_path in child_file_paths
-                  if is_path_of_extension(file_path, extension=extension_type)]
+    return max_numeric_file_index(files_in_dir(directory_path, extension_type), extension_type)
 
-    file_names = [int(file_name) for file_name in file_names if file_name.isnumeric()]
-    if not file_names:
-        return 0
 
-    return max(file_names)
+def files_in_dir(directory_path: str, extension: str = '.txt') -> list:
+    """ Names of the entries ending in extension, from a single os.scandir pass"""
+    assert_valid_extension(extension)
+    with os.scandir(directory_path) as entries:
+        return [entry.name for entry in entries
+                if len(entry.name) > len(extension) and entry.name.endswith(extension)]
 
 
-def files_in_dir(directory_path: str, extension: str = '.txt') -> list:
-    child_file_paths = os.listdir(directory_path)
-    return [file_path for file_path in child_file_paths if is_path_of_extension(file_path, extension=extension)]
+def numeric_file_index(file_name: str, extension: str) -> int | None:
+    """ '12.txt' -> 12 for the extension '.txt', None if the name without the extension is not a number"""
+    stem = file_name[:-len(extension)]
+    if stem.isdecimal():
+        return int(stem)
+    return None
+
+
+def max_numeric_file_index(file_names: Iterable[str], extension: str) -> int:
+    """ The largest numeric_file_index of the names, 0 if there are none"""
+    indexes = (numeric_file_index(file_name, extension) for file_name in file_names)
+    return max((index for index in indexes if index is not None), default=0)
 
 
 def file_exists(file_path: str) -> bool:
@@ -48,5 +157,125 @@ def is_file_blank(file_path: str) -> bool:
 
 
 def immediate_subdirs(dir_path: str) -> list[str]:
-    return tuple(os.walk(dir_path))[0][1]
+    """ Names of the subdirectories (including symlinks to directories) from a single os.scandir pass"""
+    with os.scandir(dir_path) as entries:
+        return [entry.name for entry in entries if entry.is_dir()]
+
+
+def walk_dir(dir_path: str, max_depth: int = None, extension: str = None, workers: int = 1,
+             follow_symlinks=False) -> Iterator[str]:
+    """ Lazily yields the path of every file under dir_path, recursing into subdirectories like os.walk.
+    discover_files with only the depth and extension filters, sequential by default"""
+    return discover_files(dir_path, extension=extension, max_depth=max_depth, workers=workers,
+                          follow_symlinks=follow_symlinks)
+
+
+def discover_files(root_path: str, extension: str = None, min_size: int = None, max_size: int = None,
+                   modified_after: float = None, modified_before: float = None, max_depth: int = None,
+                   workers: int = DISCOVERY_WORKERS, follow_symlinks=False) -> Iterator[str]:
+    """ Lazily yields the path of every matching file under root_path, as soon as its directory has been scanned.
+
+    extension: only files ending in it, as is_path_of_extension.
+    min_size, max_size: inclusive bounds in bytes. modified_after, modified_before: inclusive bounds on the mtime,
+        in seconds since the epoch like time.time(). Only these filters stat the files, using the os.scandir
+        DirEntry cache, so at most one stat per file.
+    max_depth: None for no limit, 0 for only the files directly in root_path, 1 to include its subdirectories...
+    workers > 1 scans subdirectories concurrently on a thread pool of that size, faster on network and NVMe
+        filesystems where parallel directory reads and stats overlap. Paths then come out in no particular order.
+    Unreadable subdirectories are skipped, as os.walk does.
+    """
+    if not is_path_dir(root_path):
+        raise NotADirectoryError(root_path)
+    if extension is not None:
+        assert_valid_extension(extension)
+
+    file_filter = _FileFilter(extension, min_size, max_size, modified_after, modified_before)
+    if workers > 1:
+        yield from _discover_files_parallel(root_path, file_filter, max_depth, workers, follow_symlinks)
+        return
+
+    # Depth first, reversed so subdirectories are visited in scan order.
+    stack = [(root_path, 0)]
+    while stack:
+        directory_path, depth = stack.pop()
+        file_paths, subdir_paths = _scan_directory(directory_path, file_filter, follow_symlinks)
+        yield from file_paths
+        if max_depth is None or depth < max_depth:
+            stack.extend((subdir_path, depth + 1) for subdir_path in reversed(subdir_paths))
+
+
+def _discover_files_parallel(root_path: str, file_filter: "_FileFilter", max_depth: int | None, workers: int,
+                             follow_symlinks: bool) -> Iterator[str]:
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {executor.submit(_scan_directory, root_path, file_filter, follow_symlinks): 0}
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    depth = pending.pop(future)
+                    file_paths, subdir_paths = future.result()
+                    if max_depth is None or depth < max_depth:
+                        for subdir_path in subdir_paths:
+                            pending[executor.submit(_scan_directory, subdir_path, file_filter, follow_symlinks)] = \
+                                depth + 1
+                    yield from file_paths
+        finally:
+            # Stop scanning early if the consumer stops iterating.
+            for future in pending:
+                future.cancel()
+
+
+class _FileFilter:
+    """ Matches the DirEntry of a file against the discover_files filters, checking the name before any stat"""
+
+    __slots__ = ("extension", "min_size", "max_size", "modified_after", "modified_before", "needs_stat")
+
+    def __init__(self, extension: str | None, min_size: int | None, max_size: int | None,
+                 modified_after: float | None, modified_before: float | None):
+        self.extension = extension
+        self.min_size = min_size
+        self.max_size = max_size
+        self.modified_after = modified_after
+        self.modified_before = modified_before
+        self.needs_stat = any(bound is not None for bound in (min_size, max_size, modified_after, modified_before))
+
+    def __call__(self, entry: os.DirEntry) -> bool:
+        extension = self.extension
+        if extension is not None and (len(entry.name) <= len(extension) or not entry.name.endswith(extension)):
+            return False
+        if not self.needs_stat:
+            return True
+
+        try:
+            stat = entry.stat()
+        except OSError:
+            # Broken symlinks, or files removed since the directory was read.
+            return False
+        if self.min_size is not None and stat.st_size < self.min_size:
+            return False
+        if self.max_size is not None and stat.st_size > self.max_size:
+            return False
+        if self.modified_after is not None and stat.st_mtime < self.modified_after:
+            return False
+        if self.modified_before is not None and stat.st_mtime > self.modified_before:
+            return False
+        return True
+
+
+def _scan_directory(dir_path: str, file_filter: _FileFilter,
+                    follow_symlinks: bool) -> tuple[list[str], list[str]]:
+    """ (matching file paths, subdirectory paths to recurse into) of one directory"""
+    file_paths = []
+    subdir_paths = []
+    try:
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if follow_symlinks or not entry.is_symlink():
+                        subdir_paths.append(entry.path)
+                elif file_filter(entry):
+                    file_paths.append(entry.path)
+    except OSError:
+        return [], []
+    return file_paths, subdir_paths
 
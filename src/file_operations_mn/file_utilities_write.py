@@ -1,20 +1,88 @@
 import os
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 
 from file_operations_mn.file_exceptions import InvalidPathError
 from file_operations_mn.path_string_utilities import is_path_dir
+from file_operations_mn.file_compression import is_compressed, open_compressed_file_object
+
+from typing import Iterable
+
+
+TAIL_BLOCK_SIZE = 1 << 12
+DURABILITY_LEVELS = ("none", "file", "file+dir")
 
 
 def trim_end_of_file_blank_line(file_path: str) -> None:
-    with open(file_path, 'r') as in_file:
-        data = in_file.read()
+    """ Removes every trailing \\n, \\r\\n and \\r by truncating in place, only the trailing newlines are read"""
+    with open(file_path, 'r+b') as file:
+        file_size = file.seek(0, os.SEEK_END)
+        search_end = file_size
+        truncate_position = 0
+        while search_end > 0:
+            block_start = max(0, search_end - TAIL_BLOCK_SIZE)
+            file.seek(block_start)
+            block = file.read(search_end - block_start)
+            content = block.rstrip(b'\r\n')
+            if content:
+                truncate_position = block_start + len(content)
+                break
+            search_end = block_start
+
+        if truncate_position != file_size:
+            file.truncate(truncate_position)
+    return None
 
-    with open(file_path, 'w') as out_file:
-        out_file.write(data.rstrip('\n'))
 
+def trim_end_of_file_blank_lines(file_paths: Iterable[str], max_workers: int = None) -> None:
+    """ trim_end_of_file_blank_line for many files at once, on a thread pool"""
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for _ in executor.map(trim_end_of_file_blank_line, file_paths):
+            pass
     return None
 
 
+def remove_last_lines_in_place(file_path: str, number_of_lines: int = 1) -> int:
+    """ Truncates the last number_of_lines lines (an unterminated final line counts as a line) without reading
+    the rest of the file. Returns the number of newlines removed"""
+    if number_of_lines <= 0:
+        return 0
+
+    with open(file_path, 'r+b') as file:
+        file_size = file.seek(0, os.SEEK_END)
+        if file_size == 0:
+            return 0
+
+        file.seek(file_size - 1)
+        ends_with_newline = file.read(1) == b'\n'
+        # The final newline belongs to the last line, so the search for line starts begins before it.
+        search_end = file_size - 1 if ends_with_newline else file_size
+        newlines_to_find = number_of_lines
+        truncate_position = 0
+
+        while search_end > 0 and newlines_to_find > 0:
+            block_start = max(0, search_end - TAIL_BLOCK_SIZE)
+            file.seek(block_start)
+            block = file.read(search_end - block_start)
+            newline_index = block.rfind(b'\n')
+            while newline_index != -1:
+                newlines_to_find -= 1
+                if newlines_to_find == 0:
+                    truncate_position = block_start + newline_index + 1
+                    break
+                newline_index = block.rfind(b'\n', 0, newline_index)
+            search_end = block_start
+
+        file.truncate(truncate_position)
+
+    newlines_found = number_of_lines - newlines_to_find
+    # The last newline found is kept, it now terminates the new final line.
+    newlines_removed = newlines_found - 1 if newlines_to_find == 0 else newlines_found
+    return newlines_removed + ends_with_newline
+
+
 def make_dir_if_not_exists(dir_path: str, parents=True) -> None:
     if is_path_dir(dir_path):
         return None
@@ -61,3 +129,95 @@ def make_empty_file(file_path: str) -> None:
     with open(file_path, "w") as outfile:
         outfile.write('')
     return None
+
+
+@contextmanager
+def open_for_save(file_path: str, mode: str = 'w', atomic=False, durability: str = "none", **open_kwargs):
+    """ open(file_path, mode) for overwriting a file, with optional crash safety.
+
+    atomic: writes to a temporary file in the same directory and os.replace()s it over file_path on success,
+        so a crash or exception leaves either the old or the new file, never a truncated one.
+    durability: 'none' leaves flushing to the OS, 'file' fsyncs the file before closing,
+        'file+dir' also fsyncs the directory so the rename itself survives a power cut.
+    """
+    if durability not in DURABILITY_LEVELS:
+        raise ValueError(f"Unknown durability: \'{durability}\', expected one of {DURABILITY_LEVELS}")
+
+    directory = os.path.dirname(os.path.abspath(file_path))
+    if not atomic:
+        with _open_synced(file_path, file_path, mode, durability, **open_kwargs) as file:
+            yield file
+        _fsync_directory(directory, durability)
+        return None
+
+    descriptor, temporary_path = _create_temporary_file(file_path, directory)
+    try:
+        with _open_synced(descriptor, file_path, mode, durability, **open_kwargs) as file:
+            yield file
+        _copy_permissions(file_path, temporary_path)
+        os.replace(temporary_path, file_path)
+    except BaseException:
+        if os.path.isfile(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+    _fsync_directory(directory, durability)
+    return None
+
+
+@contextmanager
+def _open_synced(file, file_path: str, mode: str, durability: str, **open_kwargs):
+    """ Opens file (a path or a descriptor) for writing and fsyncs it before closing.
+    A compressed file_path is written through its codec, and only fsynced once the codec has written the end of
+    the stream"""
+    if not is_compressed(file_path):
+        with open(file, mode, **open_kwargs) as opened_file:
+            yield opened_file
+            _fsync_file(opened_file, durability)
+        return None
+
+    with open(file, mode[0] + 'b') as raw_file:
+        with open_compressed_file_object(raw_file, file_path, mode, **open_kwargs) as opened_file:
+            yield opened_file
+        _fsync_file(raw_file, durability)
+    return None
+
+
+def _fsync_file(file, durability: str) -> None:
+    if durability == "none":
+        return None
+    file.flush()
+    os.fsync(file.fileno())
+    return None
+
+
+def _fsync_directory(directory: str, durability: str) -> None:
+    # Directories can't be opened for fsync on Windows, where the rename is already durable.
+    if durability != "file+dir" or os.name == "nt":
+        return None
+    descriptor = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+    return None
+
+
+def _create_temporary_file(file_path: str, directory: str) -> tuple[int, str]:
+    """ As tempfile.mkstemp, but created with mode 0o666 like open() does, so the current umask applies.
+    (mkstemp always makes 0o600 files, and the umask can only be read by changing it, which is not thread safe)"""
+    while True:
+        temporary_path = os.path.join(directory, f".{os.path.basename(file_path)}.{secrets.token_hex(8)}.tmp")
+        try:
+            descriptor = os.open(temporary_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0),
+                                 0o666)
+        except FileExistsError:
+            continue
+        return descriptor, temporary_path
+
+
+def _copy_permissions(file_path: str, temporary_path: str) -> None:
+    """ A replacement keeps the permissions of the file it replaces"""
+    if os.path.isfile(file_path):
+        os.chmod(temporary_path, os.stat(file_path).st_mode & 0o7777)
+    return None
@@ -1,22 +1,53 @@
 from abc import ABC, abstractmethod
 import os
+import io
+import time
 import json
 import csv
 
-from typing import Iterable
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, AsyncIterator
 
-from file_operations_mn.path_string_utilities import file_path_extension, is_path_of_extension
-from file_operations_mn.file_utilities_read import count_file_lines
-from file_operations_mn.file_utilities_write import make_empty_file, make_empty_file_safe
+from file_operations_mn.path_string_utilities import PathInfo
+from file_operations_mn.file_utilities_write import (make_empty_file, make_empty_file_safe, remove_last_lines_in_place,
+                                                     open_for_save)
 from file_operations_mn.file_exceptions import InvalidPathError, FileEmptyError
-from file_operations_mn.printing_decorators import save_print_decorator, load_print_decorator
+from file_operations_mn.file_utilities_read import READ_CHUNK_SIZE, newline_aligned_ranges
+from file_operations_mn.file_line_index import LineOffsetIndex, LineCountCache
+from file_operations_mn.file_locks import exclusive_append_descriptor, write_all
+from file_operations_mn.file_compression import open_file, compress_bytes
+from file_operations_mn.async_io import run_blocking, coalesced_save
+from file_operations_mn.printing_decorators import save_print_decorator, load_print_decorator, io_event_decorator
 
 import warnings
+import weakref
+
+
+PARALLEL_LOAD_CHUNK_SIZE = 64 << 20
+COMPACT_JSON_SEPARATORS = (',', ':')
 
 
 class FileReader(ABC):
-    def __init__(self, file_path: str, *args, **kwargs):
+    """ atomic and durability control how save overwrites the file, see file_utilities_write.open_for_save.
+    Both are plain attributes, so they can be changed per call site.
+    Paths ending in .gz, .bz2 or .xz are compressed and decompressed transparently, see file_compression.open_file
+    The path is parsed once into path_info, and again whenever file_path is set.
+    """
+
+    def __init__(self, file_path: str, *args, atomic=False, durability: str = "none", **kwargs):
         self.file_path = file_path
+        self.atomic = atomic
+        self.durability = durability
+
+    @property
+    def file_path(self) -> str:
+        return self.path_info.file_path
+
+    @file_path.setter
+    def file_path(self, file_path: str) -> None:
+        self.path_info = PathInfo(file_path)
 
     @property
     def exists(self) -> bool:
@@ -50,42 +81,166 @@ class FileReader(ABC):
     def load(self):
         raise NotImplementedError
 
+    def _open_for_save(self, mode: str = 'w', **open_kwargs):
+        return open_for_save(self.file_path, mode, atomic=self.atomic, durability=self.durability, **open_kwargs)
+
+    async def aload(self, *args, **kwargs):
+        """ load, run on the shared bounded executor so the event loop is not blocked"""
+        return await run_blocking(self.load, *args, **kwargs)
+
+    async def asave(self, data) -> None:
+        """ save, run on the shared bounded executor. Concurrent asave calls to the same path are coalesced,
+        only the most recent data is written"""
+        await coalesced_save(self.file_path, self.save, data)
+        return None
+
 
 class JSON_FileReader(FileReader):
-    def __init__(self, file_path: str):
-        super(JSON_FileReader, self).__init__(file_path)
+    """ compact=True saves without indentation or spaces after separators, smaller and faster to write"""
+
+    def __init__(self, file_path: str, compact=False, **kwargs):
+        super(JSON_FileReader, self).__init__(file_path, **kwargs)
+        self.compact = compact
 
+    @save_print_decorator
     def save(self, data: dict) -> None:
-        with open(self.file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
+        with self._open_for_save(encoding='utf-8') as f:
+            if self.compact:
+                json.dump(data, f, ensure_ascii=False, separators=COMPACT_JSON_SEPARATORS)
+            else:
+                json.dump(data, f, ensure_ascii=False, indent=4)
         return None
 
+    @load_print_decorator
     def load(self) -> dict:
-        with open(self.file_path, 'r', encoding='utf-8') as f:
+        with open_file(self.file_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
         return data
 
 
+class JSON_LinesFileReader(FileReader):
+    """ One compact JSON record per line (.jsonl). Records stream in and out with constant memory,
+    appends never rewrite the file, and a line-offset index gives random access by record number.
+
+    line_index: 'memory' or 'sidecar', as for CSV_Writer. Compressed paths are not supported, the index needs
+    seekable byte offsets.
+    Record n is line n, so a blank line is an invalid record and raises ValueError when read, as it would
+    shift every record number after it. A final record without a newline is still a record, an append writes
+    the missing newline first.
+    """
+
+    def __init__(self, file_path: str, line_index: str = "memory", **kwargs):
+        if line_index not in ("memory", "sidecar"):
+            raise ValueError(f"Unknown line index type: \'{line_index}\'")
+        self._line_index_type = line_index
+        super().__init__(file_path, **kwargs)
+
+    @FileReader.file_path.setter
+    def file_path(self, file_path: str) -> None:
+        """ The line index belongs to the file, so it is made again for the new one"""
+        FileReader.file_path.fset(self, file_path)
+        sidecar_path = file_path + ".idx" if self._line_index_type == "sidecar" else None
+        self._line_index = LineOffsetIndex(file_path, sidecar_path=sidecar_path)
+
+    def __len__(self) -> int:
+        line_count = len(self._line_index)
+        if os.path.getsize(self.file_path) > self._line_index.end:
+            return line_count + 1
+        return line_count
+
+    @save_print_decorator
+    def save(self, records: Iterable) -> None:
+        with self._open_for_save(encoding="utf-8") as f:
+            f.writelines(self.__dumps(record) for record in records)
+        self._line_index.rebuild()
+        return None
+
+    @load_print_decorator
+    def load(self) -> list:
+        return list(self.iter_records())
+
+    def iter_records(self, start_index: int = 0) -> Iterator:
+        """ Lazily yields records from record number start_index, seeking straight to it"""
+        with open(self.file_path, 'rb') as f:
+            if start_index > 0:
+                if start_index >= len(self):
+                    return
+                f.seek(self._record_span(start_index)[0])
+            for record_number, line in enumerate(f, start_index):
+                yield self.__loads(line, record_number)
+
+    @io_event_decorator(measure=lambda args, kwargs, _: _load_record_measure(args, kwargs))
+    def load_record(self, record_number: int):
+        if record_number < 0 or record_number >= len(self):
+            raise ValueError(f"Invalid record {record_number}")
+
+        start, end = self._record_span(record_number)
+        with open(self.file_path, 'rb') as f:
+            f.seek(start)
+            return self.__loads(f.read(end - start), record_number)
+
+    @save_print_decorator
+    def append_records(self, records: Iterable) -> None:
+        """ Every record is serialised before anything is written, so an unserialisable record appends nothing.
+        Fsyncs after writing unless durability is 'none'"""
+        text = ''.join([self.__dumps(record) for record in records])
+        if text and not self.__ends_with_newline():
+            text = '\n' + text
+        with open(self.file_path, 'a', encoding="utf-8") as f:
+            f.write(text)
+            if self.durability != "none":
+                f.flush()
+                os.fsync(f.fileno())
+        self._line_index.refresh()
+        return None
+
+    def _record_span(self, record_number: int) -> tuple[int, int]:
+        """ (start, end) byte offsets of the record, the final record may have no newline"""
+        if record_number < len(self._line_index):
+            return self._line_index.line_span(record_number)
+        return self._line_index.end, os.path.getsize(self.file_path)
+
+    def __ends_with_newline(self) -> bool:
+        """ Also True for a missing or empty file, there is no record to terminate"""
+        if not self.exists or self.is_empty:
+            return True
+        with open(self.file_path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def __loads(self, line: bytes, record_number: int):
+        if not line.strip():
+            raise ValueError(f"Blank line at record {record_number} of \'{self.file_path}\'")
+        return json.loads(line)
+
+    @staticmethod
+    def __dumps(record) -> str:
+        # Compact JSON never contains a raw newline, so every record is exactly one line.
+        return json.dumps(record, ensure_ascii=False, separators=COMPACT_JSON_SEPARATORS) + '\n'
+
+
 class TXT_FileReader(FileReader):
+    @save_print_decorator
     def save(self, lines: list[str]) -> None:
-        with open(self.file_path, 'w', encoding='utf-8') as f:
+        with self._open_for_save(encoding='utf-8') as f:
             f.writelines(lines)
 
+    @load_print_decorator
     def load(self):
-        with open(self.file_path, 'r', encoding='utf-8') as f:
+        with open_file(self.file_path, 'r', encoding='utf-8') as f:
             content = f.read()
         return content
 
 
 class TextWriterSingleLine(FileReader):
-    def __init__(self, file_path: str):
-        super().__init__(file_path)
+    def __init__(self, file_path: str, **kwargs):
+        super().__init__(file_path, **kwargs)
         if not self.exists:
             make_empty_file(file_path)
 
+    @load_print_decorator
     def load(self) -> str:
-        file_extension = file_path_extension(self.file_path)
-        if file_extension == ".txt":
+        if self.path_info.extension == ".txt":
             return self.__load_text()
         raise InvalidPathError(self.file_path)
 
@@ -96,31 +251,44 @@ class TextWriterSingleLine(FileReader):
 
         return self.load()
 
+    @save_print_decorator
     def save(self, data: str) -> None:
         assert hasattr(data, "__repr__")
-        file_extension = file_path_extension(self.file_path)
-        if file_extension == ".txt":
+        if self.path_info.extension is None:
+            raise InvalidPathError(self.file_path)
+        if self.path_info.extension == ".txt":
             self.__save_text(str(data))
         return None
 
     def __load_text(self) -> str:
-        with open(self.file_path, "r") as text_file:
+        with open_file(self.file_path, "r") as text_file:
             data = text_file.read()
         return data
 
     def __save_text(self, data) -> None:
-        with open(self.file_path, "w") as text_file:
+        with self._open_for_save() as text_file:
             text_file.write(data)
         return None
 
 
 class CSV_Writer(FileReader):
-    """ I made this because I can't stand how files die when there is or isn't an empty line at EOF"""
-
-    def __init__(self, file_path: str, header: Iterable = None, delimiter='|', *args, **kwargs):
+    """ I made this because I can't stand how files die when there is or isn't an empty line at EOF
+
+    line_index: None, 'memory' or 'sidecar'. With an index, load_line/load_range seek straight to the row
+    instead of scanning from the start of the file. 'sidecar' persists the index next to the file as '.idx'.
+
+    '.csv.gz', '.csv.bz2' and '.csv.xz' files are streamed through their codec. Appends add a new compressed
+    stream to the end of the file. Compressed files can't have a line index, can't be loaded with workers > 1
+    and can't have lines removed in place.
+    """
+
+    def __init__(self, file_path: str, header: Iterable = None, delimiter='|', *args, line_index: str = None,
+                 **kwargs):
+        self._line_index_type = line_index
+        self._sequential_file = None
+        self._sequential_file_finalizer = None
+        # Sets up the line index, line counter and load_sequential position, see the file_path setter.
         super().__init__(file_path, *args, **kwargs)
-        self.__assert_is_csv(file_path)
-        self.file_path = file_path
         self.delimiter = delimiter
         self.header = header
 
@@ -130,24 +298,49 @@ class CSV_Writer(FileReader):
             self.header = None
             self.header = self.load_line(0)[0]
 
+    @FileReader.file_path.setter
+    def file_path(self, file_path: str) -> None:
+        """ The line count, line index and load_sequential position belong to the file, so they start over"""
+        self.__close_sequential_file()
+        FileReader.file_path.fset(self, file_path)
+        self.__assert_is_csv()
+        self._line_index = self.__make_line_index(self._line_index_type)
+        self._line_counter = self._line_index if self._line_index is not None else LineCountCache(file_path)
         self._batch_index = 0
+        self._sequential_first_row_offset = 0
+
+    @property
+    def line_index(self) -> LineOffsetIndex | None:
+        """ The LineOffsetIndex of the file's lines, or None when the writer was made without a line_index"""
+        return self._line_index
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
+    @io_event_decorator(operation="len", measure=lambda args, kwargs, length: (length, None))
     def __len__(self):
-        # Remove 1, due to the empty line @ EOF.
-        return count_file_lines(self.file_path) - 1
+        # Same as count_file_lines - 1 (the empty line @ EOF), but cached and only re-counting appended data.
+        return len(self._line_counter)
 
+    @load_print_decorator
     def load(self) -> list[list[str]]:
-        with open(self.file_path, 'r') as file:
+        with open_file(self.file_path, 'r') as file:
             lines = [x for x in csv.reader(file, delimiter=self.delimiter)]
         return lines
 
+    @save_print_decorator
     def save(self, data: list[list[str]]) -> None:
-        with open(self.file_path, 'w') as file:
+        self.__close_sequential_file()
+        with self._open_for_save() as file:
             writer = csv.writer(file, delimiter=self.delimiter)
             writer.writerows(data)
+        self._line_counter.rebuild()
         return None
 
-    @load_print_decorator
+    @io_event_decorator(measure=lambda args, kwargs, rows: _load_line_measure(args, kwargs, rows))
     def load_line(self, line_number: int) -> list:
         """ For efficiently loading a specific line number """
 
@@ -155,12 +348,17 @@ class CSV_Writer(FileReader):
 
         line_increment = 1 if self.header is not None else 0
 
-        with open(self.file_path, "r") as file:
-            content = [self.__parse_row(x) for i, x in enumerate(file) if i == line_number + line_increment]
+        if self._line_index is not None:
+            return self.__load_indexed_range(line_number + line_increment, line_number + line_increment + 1)
 
-        return content
+        with open_file(self.file_path, "r") as file:
+            for i, x in enumerate(file):
+                if i == line_number + line_increment:
+                    return [self.__parse_row(x)]
 
-    @load_print_decorator
+        return []
+
+    @io_event_decorator(measure=lambda args, kwargs, rows: _load_range_measure(args, kwargs, rows))
     def load_range(self, start_index: int, end_index: int) -> list[list]:
         if start_index == end_index:
             return self.load_line(start_index)
@@ -168,8 +366,12 @@ class CSV_Writer(FileReader):
         line_increment = 1 if self.header is not None else 0
 
         self.__assert_valid_line_number(start_index, end_index - 1)
+
+        if self._line_index is not None:
+            return self.__load_indexed_range(start_index + line_increment, end_index + line_increment)
+
         # Makes use of early stopping AND known list memory allocation.
-        with open(self.file_path, "r") as file:
+        with open_file(self.file_path, "r") as file:
             lower_limit = start_index + line_increment
             upper_limit = end_index + line_increment
             content = [[] for _ in range(start_index, end_index)]
@@ -181,123 +383,308 @@ class CSV_Writer(FileReader):
 
         return content
 
-    @load_print_decorator
+    @io_event_decorator(measure=lambda args, kwargs, rows: (len(rows), None))
     def load_sequential(self, batch_size: int, from_start=False) -> list[list]:
+        """ Loads the next batch_size rows, wrapping around to the first row at EOF.
+        Keeps the file open between calls, so a full pass costs O(N). Use close() or a with block to release it,
+        otherwise it is closed when the writer is garbage collected"""
         if from_start:
             self._batch_index = 0
+            self.__close_sequential_file()
 
         line_increment = 1 if self.header is not None else 0
+        number_of_rows = len(self) - line_increment
 
-        if batch_size > len(self) - line_increment:
+        if batch_size > number_of_rows:
             raise ValueError
 
-        start_index = self._batch_index
-        end_index = self._batch_index + batch_size
-
-        overlap = False
-        if end_index > len(self) - line_increment:
-            overlap = True
-            end_index = len(self) - line_increment
-
-        content1 = self.load_range(start_index, end_index)
-
-        if overlap:
-            end_index_wrapped = batch_size - (len(self) - line_increment - start_index)
-
-            content2 = self.load_range(0, end_index_wrapped)
+        file = self.__sequential_file()
+        content = []
+        while len(content) < batch_size:
+            raw_line = file.readline()
+            if not raw_line.endswith(b'\n'):
+                file.seek(self._sequential_first_row_offset)
+                self._batch_index = 0
+                continue
+            content.append(self.__parse_row(raw_line.decode("utf-8")))
+            self._batch_index += 1
+
+        if self._batch_index >= number_of_rows:
+            file.seek(self._sequential_first_row_offset)
+            self._batch_index = 0
 
-            self._batch_index = end_index_wrapped
-            return content1 + content2
+        return content
 
-        if end_index >= len(self) - line_increment:
-            self._batch_index = 0
-        else:
-            self._batch_index = end_index
+    async def aappend_lines(self, lines: list, locked=True) -> None:
+        """ append_lines on the shared executor, locked by default since executor threads may append concurrently"""
+        await run_blocking(self.append_lines, lines, locked=locked)
+        return None
 
-        return content1
+    async def aiter_rows(self, start_index: int = 0, as_float=False, batch_size: int = 1000) -> AsyncIterator[list]:
+        """ iter_rows as an async iterator, reading batch_size rows per trip to the executor"""
+        batches = self.iter_batches(batch_size, start_index=start_index, as_float=as_float)
+        try:
+            while True:
+                batch = await run_blocking(next, batches, None)
+                if batch is None:
+                    return
+                for row in batch:
+                    yield row
+        finally:
+            batches.close()
+
+    @io_event_decorator(measure=lambda args, kwargs, rows: (len(rows), None))
+    def load_rows_at(self, offsets: Iterable[int]) -> list[list]:
+        """ Loads the row starting at each byte offset, in the order given. Sort the offsets to keep reads sequential"""
+        with open_file(self.file_path, 'rb') as file:
+            content = []
+            for offset in offsets:
+                file.seek(offset)
+                content.append(self.__parse_row(file.readline().decode("utf-8")))
+        return content
 
     @load_print_decorator
-    def load_all(self, safe=True, as_float=False) -> list:
+    def load_all(self, safe=True, as_float=False, workers: int = 1, chunk_size: int = PARALLEL_LOAD_CHUNK_SIZE) -> list:
+        """ workers > 1 parses newline-aligned byte ranges of chunk_size in a process pool, keeping the row order.
+        Only worth it for large, uncompressed files, and assumes no quoted fields contain newlines"""
         if safe and not self.exists:
             raise FileNotFoundError
 
+        if workers > 1 and self.path_info.compression is None:
+            return self.__load_as_list_parallel(as_float, workers, chunk_size)
+
         return self.__load_as_list(as_float=as_float)
 
+    def iter_rows(self, start_index: int = 0, as_float=False) -> Iterator[list]:
+        """ Lazily yields parsed rows one at a time with constant memory, skipping the header.
+        start_index is the first data row to yield, seeking straight to it when there is a line index"""
+        line_increment = 1 if self.header is not None else 0
+
+        with open_file(self.file_path, 'r', newline='', encoding="utf-8") as file:
+            self.__seek_to_line(file, start_index + line_increment)
+            csv_reader = csv.reader(file, delimiter=self.delimiter)
+            if as_float:
+                for row in csv_reader:
+                    yield [float(element) for element in row]
+            else:
+                yield from csv_reader
+
+    def iter_batches(self, batch_size: int, start_index: int = 0, as_float=False) -> Iterator[list[list]]:
+        """ Lazily yields lists of batch_size rows, the final batch may be shorter"""
+        if batch_size < 1:
+            raise ValueError(f"Invalid batch size {batch_size}")
+
+        rows = self.iter_rows(start_index=start_index, as_float=as_float)
+        batch = list(islice(rows, batch_size))
+        while batch:
+            yield batch
+            batch = list(islice(rows, batch_size))
+
+    @load_print_decorator
+    def load_numeric(self, chunk_size: int = READ_CHUNK_SIZE) -> tuple[array, tuple[int, int]]:
+        """ For numeric-only files. Returns every value as one flat row-major array('d'), and the (rows, columns)
+        shape. 8 bytes per value, instead of a Python float and list slot per value with load_all(as_float=True).
+        Raises ValueError for the same files load_all(as_float=True) does: empty cells, rows of different lengths,
+        and anything float() can't parse. Blank lines are skipped"""
+        values = array('d')
+        number_of_columns = 0
+        delimiter = self.delimiter.encode("utf-8")
+
+        with open_file(self.file_path, 'rb') as file:
+            if self.header is not None:
+                file.readline()
+
+            remainder = b''
+            while True:
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    chunk, remainder = remainder, b''
+                    if not chunk:
+                        break
+                else:
+                    chunk = remainder + chunk
+                    last_newline = chunk.rfind(b'\n')
+                    if last_newline == -1:
+                        remainder = chunk
+                        continue
+                    remainder = chunk[last_newline + 1:]
+                    chunk = chunk[:last_newline + 1]
+
+                lines = [line for line in chunk.split(b'\n') if line.strip()]
+                if not lines:
+                    continue
+                if number_of_columns == 0:
+                    number_of_columns = lines[0].count(delimiter) + 1
+                if any(line.count(delimiter) != number_of_columns - 1 for line in lines):
+                    raise ValueError(f"The file \'{self.file_path}\' has rows of different lengths")
+                # float() ignores the '\r' of csv.writer line endings, and raises on an empty cell.
+                values.extend(map(float, delimiter.join(lines).split(delimiter)))
+
+        return values, (len(values) // number_of_columns if number_of_columns else 0, number_of_columns)
+
+    def load_numeric_columns(self, chunk_size: int = READ_CHUNK_SIZE) -> list[array]:
+        """ As load_numeric, but split into one array('d') per column"""
+        values, (_, number_of_columns) = self.load_numeric(chunk_size=chunk_size)
+        return [values[column::number_of_columns] for column in range(number_of_columns)]
+
+    def load_numpy(self, chunk_size: int = READ_CHUNK_SIZE):
+        """ As load_numeric, as a zero-copy (rows, columns) np.frombuffer view. Only works if NumPy is installed"""
+        try:
+            import numpy as np
+        except ModuleNotFoundError as error:
+            raise ModuleNotFoundError("load_numpy needs NumPy, use load_numeric for a stdlib array") from error
+
+        values, shape = self.load_numeric(chunk_size=chunk_size)
+        return np.frombuffer(values, dtype=np.float64).reshape(shape)
+
     @save_print_decorator
     def write(self, data: Iterable) -> None:
         assert isinstance(data, Iterable), TypeError
-        file_extension = file_path_extension(self.file_path)
-        if file_extension == ".csv":
+        if self.path_info.extension == ".csv":
+            self.__close_sequential_file()
             self.__save(data)
+            if self.exists:
+                self._line_counter.rebuild()
+        return None
+
+    def close(self) -> None:
+        """ Releases the file handle kept open by load_sequential, the batch position is kept"""
+        self.__close_sequential_file()
         return None
 
+    def appender(self, max_rows: int = 1000, max_bytes: int = 1 << 20, flush_interval: float = None,
+                 locked=False) -> "CSV_Appender":
+        """ A buffered appender that keeps the file open, use it in a with block"""
+        return CSV_Appender(self, max_rows=max_rows, max_bytes=max_bytes, flush_interval=flush_interval,
+                            locked=locked)
+
     def make_empty_file_if_not_exists(self) -> None:
         if not self.exists:
             if self.header is None:
                 make_empty_file_safe(self.file_path)
                 return None
-            with open(self.file_path, 'w', newline='', encoding="utf-8") as file:
+            with open_file(self.file_path, 'w', newline='', encoding="utf-8") as file:
                 csv_writer = csv.writer(file, delimiter=self.delimiter)
                 csv_writer.writerow(self.header)
         return None
 
-    def append_lines(self, lines: list) -> None:
-        if not self.exists or self.is_empty:
+    def append_lines(self, lines: list, locked=False) -> None:
+        """ locked=True is safe with other threads and processes appending to the same file: the batch is written
+        with a single os.write to an O_APPEND descriptor, under an in-process lock and an fcntl file lock"""
+        self.__append(lines, locked)
+        return None
+
+    @io_event_decorator(operation="append_lines", is_save=True,
+                        measure=lambda args, kwargs, number_of_bytes: (len(args[1]), number_of_bytes))
+    def __append(self, lines: list, locked: bool) -> int:
+        """ append_lines, returning the number of bytes written to the file"""
+        if locked:
+            number_of_bytes = self.__append_locked(lines)
+        elif not self.exists or self.is_empty:
             self.__save(lines)
+            number_of_bytes = os.path.getsize(self.file_path) if self.exists else 0
         else:
-            if self.__lines_are_empty(lines):
-                return None
+            if self._lines_are_empty(lines):
+                return 0
+
+            # Catches changes made by others first, then only the newlines written here are added to the count,
+            # so appending to a compressed file doesn't decompress all of it.
+            self._line_counter.refresh()
+            previous_stat = os.stat(self.file_path)
+            text = ''.join([self.delimiter.join(line) + '\n' for line in lines])
+            with open_file(self.file_path, 'a') as file:
+                file.write(text)
+            self._line_counter.extend(text.count('\n'), previous_stat)
+            return os.path.getsize(self.file_path) - previous_stat.st_size
+
+        if self.exists:
+            self._line_counter.refresh()
+        return number_of_bytes
 
-            with open(self.file_path, 'a') as file:
-                for line in lines:
-                    file.write(self.delimiter.join(line) + '\n')
+    def remove_last_line(self) -> None:
+        self.remove_last_lines(1)
         return None
 
-    def remove_last_line(self) -> None:
+    @io_event_decorator(is_save=True, measure=lambda args, kwargs, _: (_argument(args, kwargs, 1, "number_of_lines"),
+                                                                        None))
+    def remove_last_lines(self, number_of_lines: int) -> None:
+        """ Seeks back from EOF and truncates in place, so the cost does not depend on the file size"""
+        if self.path_info.compression is not None:
+            raise ValueError(f"Can't truncate the compressed file \'{self.file_path}\' in place")
+
         if len(self) == 0:
             warnings.warn("File is empty, cannot remove empty line")
             return None
 
-        with open(self.file_path, 'r') as text_file:
-            content = text_file.readlines()
-
-        with open(self.file_path, 'w') as text_file:
-            text_file.writelines(content[:-1])
-
+        self.__close_sequential_file()
+        newlines_removed = remove_last_lines_in_place(self.file_path, number_of_lines)
+        self._line_counter.truncate(os.path.getsize(self.file_path), newlines_removed=newlines_removed)
         return None
 
     def __load_as_list(self, as_float=False) -> list:
-        with open(self.file_path, 'r') as file:
-            csv_reader = csv.reader(file, delimiter=self.delimiter)
-            if self.header is not None:
-                next(csv_reader)
+        return list(self.iter_rows(as_float=as_float))
 
-            if as_float:
-                data = [[float(element) for element in row] for row in csv_reader]
-            else:
-                data = [row for row in csv_reader]
+    def __load_as_list_parallel(self, as_float: bool, workers: int, chunk_size: int) -> list:
+        first_row_offset = 0
+        if self.header is not None:
+            with open(self.file_path, 'rb') as file:
+                file.readline()
+                first_row_offset = file.tell()
+
+        byte_ranges = newline_aligned_ranges(self.file_path, first_row_offset, chunk_size)
+        if len(byte_ranges) <= 1:
+            return self.__load_as_list(as_float=as_float)
+
+        data = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parsed_ranges = executor.map(_parse_csv_byte_range, [self.file_path] * len(byte_ranges), byte_ranges,
+                                         [self.delimiter] * len(byte_ranges), [as_float] * len(byte_ranges))
+            for rows in parsed_ranges:
+                data.extend(rows)
         return data
 
+    def __append_locked(self, lines: list) -> int:
+        """ Returns the number of bytes written"""
+        if self._lines_are_empty(lines):
+            return 0
+
+        with exclusive_append_descriptor(self.file_path) as descriptor:
+            # The emptiness check happens under the lock, so only one appender ever writes the header.
+            if os.fstat(descriptor).st_size == 0:
+                text = self.__format_with_header(lines)
+            else:
+                text = ''.join([self.delimiter.join(line) + '\n' for line in lines])
+            data = text.encode("utf-8")
+            if self.path_info.compression is not None:
+                # A complete stream per batch, so concurrent appenders never interleave inside a stream.
+                data = compress_bytes(self.file_path, data)
+            write_all(descriptor, data)
+        return len(data)
+
     def __save(self, lines: list) -> None:
-        if self.__lines_are_empty(lines):
+        if self._lines_are_empty(lines):
             return None
 
+        with self._open_for_save(newline='', encoding="utf-8") as file:
+            file.write(self.__format_with_header(lines))
+        return None
+
+    def __format_with_header(self, lines: list) -> str:
         rows_to_write = [*lines]
         if self.header is not None:
             rows_to_write = [list(self.header)] + rows_to_write
 
-        with open(self.file_path, 'w', newline='', encoding="utf-8") as file:
-            csv_writer = csv.writer(file, delimiter=self.delimiter)
-            csv_writer.writerows(rows_to_write)
-        return None
+        text = io.StringIO(newline='')
+        csv_writer = csv.writer(text, delimiter=self.delimiter)
+        csv_writer.writerows(rows_to_write)
+        return text.getvalue()
 
-    @staticmethod
-    def __assert_is_csv(file_path) -> None:
-        assert is_path_of_extension(file_path, '.csv'), InvalidPathError
+    def __assert_is_csv(self) -> None:
+        assert self.path_info.extension == '.csv', InvalidPathError
         return None
 
     @staticmethod
-    def __lines_are_empty(lines: list[list]) -> bool:
+    def _lines_are_empty(lines: list[list]) -> bool:
         if sum([1 for line in lines if not line]) > 0:
             warnings.warn("Do not try to write an empty list.")
             return True
@@ -312,5 +699,200 @@ class CSV_Writer(FileReader):
                 raise ValueError
         return None
 
+    def _indexed_bytes(self, start_index: int, end_index: int) -> int | None:
+        """ The byte span of data rows [start_index, end_index), None without a line index"""
+        if self._line_index is None:
+            return None
+
+        line_increment = 1 if self.header is not None else 0
+        start, _ = self._line_index.line_span(start_index + line_increment)
+        _, end = self._line_index.line_span(end_index - 1 + line_increment)
+        return end - start
+
+    def __load_indexed_range(self, start_line: int, end_line: int) -> list[list]:
+        start, _ = self._line_index.line_span(start_line)
+        _, end = self._line_index.line_span(end_line - 1)
+        with open(self.file_path, 'rb') as file:
+            file.seek(start)
+            block = file.read(end - start)
+        # Every indexed line ends with a newline, so the final split element is always empty.
+        return [self.__parse_row(row) for row in block.decode("utf-8").split('\n')[:-1]]
+
+    def __sequential_file(self):
+        """ The open binary handle used by load_sequential, positioned at row _batch_index"""
+        if self._sequential_file is not None:
+            return self._sequential_file
+
+        line_increment = 1 if self.header is not None else 0
+        file = open_file(self.file_path, 'rb')
+        self.__seek_to_line(file, line_increment)
+        self._sequential_first_row_offset = file.tell()
+        if self._batch_index > 0:
+            self.__seek_to_line(file, line_increment + self._batch_index)
+        self._sequential_file = file
+        # Closes the handle if the writer is garbage collected without close() or a with block.
+        self._sequential_file_finalizer = weakref.finalize(self, file.close)
+        return file
+
+    def __close_sequential_file(self) -> None:
+        if self._sequential_file is not None:
+            self._sequential_file_finalizer()
+            self._sequential_file = None
+            self._sequential_file_finalizer = None
+        return None
+
+    def __seek_to_line(self, file, line_number: int) -> None:
+        """ Moves an open file to the start of line_number, or to EOF if there are fewer lines"""
+        file.seek(0)
+        if line_number <= 0:
+            return None
+
+        if self._line_index is not None:
+            if line_number < len(self._line_index):
+                file.seek(self._line_index.offset(line_number))
+            else:
+                file.seek(0, os.SEEK_END)
+            return None
+
+        for _ in islice(file, line_number):
+            pass
+        return None
+
+    def __make_line_index(self, line_index: str) -> LineOffsetIndex | None:
+        if line_index is None:
+            return None
+        if line_index == "memory":
+            return LineOffsetIndex(self.file_path)
+        if line_index == "sidecar":
+            return LineOffsetIndex(self.file_path, sidecar_path=self.file_path + ".idx")
+        raise ValueError(f"Unknown line index type: \'{line_index}\'")
+
     def __parse_row(self, row: str) -> list:
-        return row[:-1].split(self.delimiter)
+        return row.rstrip('\r\n').split(self.delimiter)
+
+
+class CSV_Appender:
+    """ Buffers rows for a CSV_Writer and appends them in one write per flush, keeping the file open between flushes.
+
+    Flushes when max_rows rows or max_bytes bytes (UTF-8 encoded) are buffered, when flush_interval seconds have passed since the
+    last flush (checked on each append), on flush(), and on close()/leaving the with block.
+    The first flush into a missing or empty file goes through CSV_Writer.append_lines, so the header is written.
+    For a compressed file every flush is a separate compressed stream, so flushed rows are readable straight away.
+    If the file is replaced while the appender is open (an atomic save, or a delete) the next flush reopens it,
+    rather than writing to the old, unlinked file.
+    locked=True makes every flush a CSV_Writer.append_lines(locked=True) group commit, so the locking cost is paid
+    once per batch rather than once per row.
+    """
+
+    def __init__(self, csv_writer: CSV_Writer, max_rows: int = 1000, max_bytes: int = 1 << 20,
+                 flush_interval: float = None, locked=False):
+        self.csv_writer = csv_writer
+        self.locked = locked
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self._rows = []
+        self._buffered_bytes = 0
+        self._file = None
+        self._last_flush_time = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def append_lines(self, lines: list) -> None:
+        if CSV_Writer._lines_are_empty(lines):
+            return None
+
+        delimiter = self.csv_writer.delimiter
+        for line in lines:
+            self._rows.append(line)
+            self._buffered_bytes += len((delimiter.join(line) + '\n').encode("utf-8"))
+
+        if self.__should_flush():
+            self.flush()
+        return None
+
+    def flush(self) -> None:
+        if not self._rows:
+            return None
+
+        self.__close_if_replaced()
+        if self.locked:
+            self.csv_writer.append_lines(self._rows, locked=True)
+        elif self._file is None and (not self.csv_writer.exists or self.csv_writer.is_empty):
+            self.csv_writer.append_lines(self._rows)
+        elif self.csv_writer.path_info.compression is not None:
+            self.csv_writer.append_lines(self._rows)
+        else:
+            if self._file is None:
+                self._file = open(self.csv_writer.file_path, 'a', encoding="utf-8")
+            delimiter = self.csv_writer.delimiter
+            self._file.write(''.join([delimiter.join(line) + '\n' for line in self._rows]))
+            self._file.flush()
+
+        self._rows = []
+        self._buffered_bytes = 0
+        self._last_flush_time = time.monotonic()
+        return None
+
+    def close(self) -> None:
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        return None
+
+    def __close_if_replaced(self) -> None:
+        if self._file is None:
+            return None
+        try:
+            replaced = os.stat(self.csv_writer.file_path).st_ino != os.fstat(self._file.fileno()).st_ino
+        except FileNotFoundError:
+            replaced = True
+        if replaced:
+            self._file.close()
+            self._file = None
+        return None
+
+    def __should_flush(self) -> bool:
+        if len(self._rows) >= self.max_rows or self._buffered_bytes >= self.max_bytes:
+            return True
+        if self.flush_interval is not None:
+            return time.monotonic() - self._last_flush_time >= self.flush_interval
+        return False
+
+
+def _argument(args: tuple, kwargs: dict, position: int, name: str):
+    return args[position] if len(args) > position else kwargs[name]
+
+
+def _load_record_measure(args: tuple, kwargs: dict) -> tuple[int, int]:
+    start, end = args[0]._record_span(_argument(args, kwargs, 1, "record_number"))
+    return 1, end - start
+
+
+def _load_line_measure(args: tuple, kwargs: dict, rows: list) -> tuple[int, int | None]:
+    line_number = _argument(args, kwargs, 1, "line_number")
+    return len(rows), args[0]._indexed_bytes(line_number, line_number + 1)
+
+
+def _load_range_measure(args: tuple, kwargs: dict, rows: list) -> tuple[int, int | None]:
+    start_index = _argument(args, kwargs, 1, "start_index")
+    end_index = max(_argument(args, kwargs, 2, "end_index"), start_index + 1)
+    return len(rows), args[0]._indexed_bytes(start_index, end_index)
+
+
+def _parse_csv_byte_range(file_path: str, byte_range: tuple[int, int], delimiter: str, as_float: bool) -> list:
+    """ Process pool worker for CSV_Writer.load_all, parses rows exactly like CSV_Writer.iter_rows"""
+    start, end = byte_range
+    with open(file_path, 'rb') as file:
+        file.seek(start)
+        text = file.read(end - start).decode("utf-8")
+
+    csv_reader = csv.reader(io.StringIO(text, newline=''), delimiter=delimiter)
+    if as_float:
+        return [[float(element) for element in row] for row in csv_reader]
+    return list(csv_reader)
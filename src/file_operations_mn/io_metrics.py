@@ -0,0 +1,105 @@
+import json
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from file_operations_mn.printing_decorators import IOEvent, add_io_hook, remove_io_hook
+
+
+LATENCY_BUCKETS = (1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0, 10.0)
+
+
+class IOMetrics:
+    """ Opt-in registry of per path, per operation call counts, latency histograms, bytes and rows.
+
+    It is an IO hook, so it only records once enabled (or inside measure_io), e.g.
+        with measure_io() as metrics:
+            run_job()
+        print(metrics.to_json(indent=4))
+    """
+
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event: IOEvent) -> None:
+        self.record(event)
+        return None
+
+    def record(self, event: IOEvent) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(event.path, {}).get(event.operation)
+            if stats is None:
+                stats = self._stats[event.path][event.operation] = _OperationStats()
+            stats.add(event)
+        return None
+
+    def enable(self) -> None:
+        add_io_hook(self)
+        return None
+
+    def disable(self) -> None:
+        remove_io_hook(self)
+        return None
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats = {}
+        return None
+
+    def snapshot(self) -> dict:
+        """ {path: {operation: {calls, total_seconds, max_seconds, bytes_read, bytes_written, rows,
+        latency_histogram}}}, the histogram keys are the bucket upper bounds in seconds"""
+        with self._lock:
+            return {path: {operation: stats.as_dict() for operation, stats in operations.items()}
+                    for path, operations in self._stats.items()}
+
+    def to_json(self, indent: int = None) -> str:
+        return json.dumps(self.snapshot(), indent=indent)
+
+
+class _OperationStats:
+    __slots__ = ("calls", "total_seconds", "max_seconds", "bytes_read", "bytes_written", "rows", "histogram")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.rows = 0
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def add(self, event: IOEvent) -> None:
+        self.calls += 1
+        self.total_seconds += event.elapsed
+        self.max_seconds = max(self.max_seconds, event.elapsed)
+        if event.bytes is not None:
+            if event.is_save:
+                self.bytes_written += event.bytes
+            else:
+                self.bytes_read += event.bytes
+        if event.rows is not None:
+            self.rows += event.rows
+        self.histogram[bisect_left(LATENCY_BUCKETS, event.elapsed)] += 1
+        return None
+
+    def as_dict(self) -> dict:
+        bucket_names = [f"<={bucket:g}" for bucket in LATENCY_BUCKETS] + ["+inf"]
+        return {"calls": self.calls, "total_seconds": self.total_seconds, "max_seconds": self.max_seconds,
+                "bytes_read": self.bytes_read, "bytes_written": self.bytes_written, "rows": self.rows,
+                "latency_histogram": dict(zip(bucket_names, self.histogram))}
+
+
+default_metrics = IOMetrics()
+
+
+@contextmanager
+def measure_io(metrics: IOMetrics = None):
+    """ Records every IO event inside the with block into metrics (a fresh IOMetrics by default)"""
+    metrics = IOMetrics() if metrics is None else metrics
+    metrics.enable()
+    try:
+        yield metrics
+    finally:
+        metrics.disable()
@@ -0,0 +1,102 @@
+import os
+import json
+from typing import Iterator
+
+from file_operations_mn.file_writers import JSON_FileReader, JSON_LinesFileReader
+
+
+COMPACT_THRESHOLD_BYTES = 1 << 20
+
+
+class JSON_StateStore:
+    """ A key-value state file where each update costs O(update) instead of rewriting the whole JSON document.
+
+    Reads are served from an in-memory dict. Every set/delete is appended as a change record to a JSON Lines
+    log next to the file ('<file_path>.log'). Once the log passes compact_threshold_bytes the state is saved
+    atomically to the JSON file and the log is cleared. Opening the store replays the log on top of the file,
+    so it survives crashes at any point (replaying an already compacted record is harmless).
+
+    durability applies to both the log appends and the compaction saves, see open_for_save.
+    """
+
+    def __init__(self, file_path: str, compact_threshold_bytes: int = COMPACT_THRESHOLD_BYTES,
+                 durability: str = "none", compact=False):
+        self.json_reader = JSON_FileReader(file_path, compact=compact, atomic=True, durability=durability)
+        self.log_reader = JSON_LinesFileReader(file_path + ".log", durability=durability)
+        self.compact_threshold_bytes = compact_threshold_bytes
+        self._state = {}
+        self.__open()
+
+    def __getitem__(self, key: str):
+        return self._state[key]
+
+    def __setitem__(self, key: str, value) -> None:
+        self.update({key: value})
+
+    def __delitem__(self, key: str) -> None:
+        if key not in self._state:
+            raise KeyError(key)
+        self.__log([{"op": "delete", "key": key}])
+        del self._state[key]
+        self.__compact_if_needed()
+        return None
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._state
+
+    def __len__(self) -> int:
+        return len(self._state)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._state)
+
+    def get(self, key: str, default=None):
+        return self._state.get(key, default)
+
+    def update(self, values: dict) -> None:
+        """ Logs every key in a single append"""
+        self.__log([{"op": "set", "key": key, "value": value} for key, value in values.items()])
+        self._state.update(values)
+        self.__compact_if_needed()
+        return None
+
+    def to_dict(self) -> dict:
+        return dict(self._state)
+
+    def compact(self) -> None:
+        """ Saves the full state to the JSON file, then clears the log"""
+        self.json_reader.save(self._state)
+        self.log_reader.save([])
+        return None
+
+    def __log(self, records: list[dict]) -> None:
+        # append_records serialises every record before writing, so an unserialisable value writes nothing.
+        self.log_reader.append_records(records)
+        return None
+
+    def __compact_if_needed(self) -> None:
+        if os.path.getsize(self.log_reader.file_path) >= self.compact_threshold_bytes:
+            self.compact()
+        return None
+
+    def __open(self) -> None:
+        if self.json_reader.exists and not self.json_reader.is_empty:
+            self._state = self.json_reader.load()
+
+        if not self.log_reader.exists or self.log_reader.is_empty:
+            return None
+
+        with open(self.log_reader.file_path, 'rb') as file:
+            for line in file:
+                if not line.endswith(b'\n'):
+                    # A crash part way through an append leaves a torn, unterminated final record, which was
+                    # never acknowledged. Anything else that fails to parse raises, leaving the log untouched.
+                    break
+                record = json.loads(line)
+                if record["op"] == "set":
+                    self._state[record["key"]] = record["value"]
+                else:
+                    self._state.pop(record["key"], None)
+        # Folding the log in now also drops any torn record before the next append lands after it.
+        self.compact()
+        return None
@@ -1,6 +1,32 @@
 from file_operations_mn.file_exceptions import InvalidPathError
 
 import os
+from functools import lru_cache
+from itertools import repeat
+from typing import Iterable
+
+
+COMPRESSION_SUFFIXES = (".gz", ".bz2", ".xz")
+PATH_CACHE_SIZE = 4096
+
+
+class PathInfo:
+    """ What the file readers need to know about a path, parsed once.
+
+    extension ignores any compression suffix, so it is '.csv' for 'data.csv.gz', and None without an extension.
+    Like is_path_of_extension it is everything from the last dot, so 'dir/.csv' also has the extension '.csv'.
+    compression is the compression suffix, or None.
+    """
+
+    __slots__ = ("file_path", "extension", "compression")
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.compression = compression_suffix(file_path)
+        self.extension = _extension_or_none(file_path_without_compression(file_path))
+
+    def __repr__(self) -> str:
+        return f"PathInfo({self.file_path!r})"
 
 
 def is_path_dir(dir_path: str) -> bool:
@@ -13,6 +39,7 @@ def path_parent_dir(file_path: str) -> str:
     return os.path.dirname(file_path)
 
 
+@lru_cache(maxsize=PATH_CACHE_SIZE)
 def is_path_of_extension(file_path: str, extension: str= '.txt') -> bool:
     """ Only checks the string, not that file exists"""
     if len(extension) == 1:
@@ -24,71 +51,122 @@ def is_path_of_extension(file_path: str, extension: str= '.txt') -> bool:
     if '.' not in extension:
         raise InvalidPathError(f"The extension \'{extension}\' is invalid.")
 
-    if file_path[-len(extension):] != extension:
-        return False
-    return True
+    return file_path.endswith(extension)
+
+
+def assert_valid_extension(extension: str) -> None:
+    """ The same checks as is_path_of_extension, for validating an extension once before matching many paths"""
+    if len(extension) == 1 or '.' not in extension:
+        raise InvalidPathError(f"The extension \'{extension}\' is invalid.")
+    return None
 
 
+@lru_cache(maxsize=PATH_CACHE_SIZE)
 def file_path_without_extension(file_path: str) -> str:
     """ Does not read/write to the file in any way"""
-    if '.' not in file_path or file_path[-1] == '.' or file_path[-2] == '.':
+    dot_index = file_path.rfind('.')
+    if dot_index == -1 or dot_index >= len(file_path) - 2:
         raise InvalidPathError(file_path)
+    return file_path[:dot_index]
 
-    stop_index = 0
-    for i, character in enumerate(reversed(file_path)):
-        if character == '.':
-            stop_index = i + 1
-            break
 
-    return file_path[:-stop_index]
+def file_paths_without_extension(file_paths: Iterable[str]) -> list[str]:
+    """ file_path_without_extension of every path, without a function call per path"""
+    stems = []
+    for file_path in file_paths:
+        dot_index = file_path.rfind('.')
+        if dot_index == -1 or dot_index >= len(file_path) - 2:
+            raise InvalidPathError(file_path)
+        stems.append(file_path[:dot_index])
+    return stems
 
 
+@lru_cache(maxsize=PATH_CACHE_SIZE)
 def file_path_extension(file_path: str) -> str:
-    dot_index = -1
-    for index in range(len(file_path) - 1, -1, -1):
-        if file_path[index] == '.':
-            dot_index = index
-            break
-    if dot_index != -1:
-        return file_path[dot_index:]
-    raise InvalidPathError(file_path)
-
+    dot_index = file_path.rfind('.')
+    if dot_index == -1:
+        raise InvalidPathError(file_path)
+    return file_path[dot_index:]
 
-def parent_path(path: str, parent_num: int=1) -> str:
-    if len(path) <= 1:
-        raise InvalidPathError(path)
 
-    parent_path_start = 0
+def file_path_extensions(file_paths: Iterable[str]) -> list[str]:
+    """ file_path_extension of every path, finding every dot in one C-level pass"""
+    file_paths = list(file_paths)
+    dot_indexes = list(map(str.rfind, file_paths, repeat('.')))
+    if -1 in dot_indexes:
+        raise InvalidPathError(file_paths[dot_indexes.index(-1)])
+    return [file_path[dot_index:] for file_path, dot_index in zip(file_paths, dot_indexes)]
 
-    for i, char in enumerate(reversed(path)):
-        if char == '/' or char == '\\':
-            parent_path_start = i + 1
-            break
 
-    parent_path_str = path
-    if parent_path_start != 0:
-        parent_path_str = path[:-parent_path_start]
+@lru_cache(maxsize=PATH_CACHE_SIZE)
+def compression_suffix(file_path: str) -> str | None:
+    """ '.gz', '.bz2' or '.xz' for a compressed path such as 'data.csv.gz', otherwise None"""
+    for suffix in COMPRESSION_SUFFIXES:
+        if len(file_path) > len(suffix) and file_path.endswith(suffix):
+            return suffix
+    return None
 
-    if parent_num > 1:
-        return parent_path(parent_path_str, parent_num - 1)
 
-    return parent_path_str
+@lru_cache(maxsize=PATH_CACHE_SIZE)
+def file_path_without_compression(file_path: str) -> str:
+    """ 'data.csv.gz' -> 'data.csv', uncompressed paths are returned unchanged"""
+    suffix = compression_suffix(file_path)
+    if suffix is None:
+        return file_path
+    return file_path[:-len(suffix)]
 
 
+@lru_cache(maxsize=PATH_CACHE_SIZE)
+def parent_path(path: str, parent_num: int=1) -> str:
+    """ Strips the last parent_num components, splitting on '/' and '\\'. A path without separators is returned
+    unchanged"""
+    for _ in range(parent_num if parent_num > 1 else 1):
+        if len(path) <= 1:
+            raise InvalidPathError(path)
+        # _last_separator_index inlined, this runs once per level of every path.
+        separator_index = path.rfind('/')
+        backslash_index = path.rfind('\\', separator_index + 1)
+        if backslash_index != -1:
+            separator_index = backslash_index
+        if separator_index != -1:
+            path = path[:separator_index]
+    return path
+
+
+def parent_paths(paths: Iterable[str], parent_num: int=1) -> list[str]:
+    """ parent_path of every path, in one call, bypassing the cache so a big batch doesn't evict every other path"""
+    uncached_parent_path = parent_path.__wrapped__
+    return [uncached_parent_path(path, parent_num) for path in paths]
+
+
+@lru_cache(maxsize=PATH_CACHE_SIZE)
 def path_parent_dir_only_parent(path: str) -> str:
+    """ The name of the directory containing the last component, 'a/b/c.csv' -> 'b'.
+    The path is returned unchanged if it has fewer than 2 separators"""
     if len(path) <= 1:
         raise InvalidPathError(path)
 
-    start = 0
-    end = 0
-    for i, char in enumerate(reversed(path)):
-        if char == '/' or char == '\\':
-            if start != 0:
-                end = i
-                break
-            start = i + 1
-
-    parent_path_str = path
-    if end != 0:
-        parent_path_str = path[-end:-start]
-    return parent_path_str
+    last_separator_index = _last_separator_index(path, len(path))
+    if last_separator_index == -1:
+        return path
+
+    separator_index = _last_separator_index(path, last_separator_index)
+    if separator_index == -1:
+        return path
+    return path[separator_index + 1:last_separator_index]
+
+
+def _extension_or_none(file_path: str) -> str | None:
+    """ file_path from its last dot, None if that dot is the first character or comes before the file name"""
+    dot_index = file_path.rfind('.')
+    if dot_index <= 0 or dot_index < _last_separator_index(file_path, len(file_path)):
+        return None
+    return file_path[dot_index:]
+
+
+def _last_separator_index(path: str, end: int) -> int:
+    """ Index of the last '/' or '\\' in path[:end], -1 if there is none"""
+    separator_index = path.rfind('/', 0, end)
+    # A backslash only matters after the last slash, which keeps the second search short.
+    backslash_index = path.rfind('\\', separator_index + 1, end)
+    return separator_index if backslash_index == -1 else backslash_index
@@ -1,39 +1,126 @@
-from typing import Any
+import logging
+import os
+import time
+from functools import wraps
+from typing import NamedTuple
 
 
-def load_print_decorator(func: callable) -> callable:
-    type_return = Any
+class IOEvent(NamedTuple):
+    path: str
+    operation: str
+    bytes: int | None
+    rows: int | None
+    elapsed: float
+    is_save: bool = False
 
-    try:
-        type_return = func.__annotations__["return"]
-    except KeyError:
-        pass
 
-    def wrapper(*args, **kwargs) -> type_return:
-        file_path = args[0].file_path
-        print('-'*80)
-        print(f"Loading file: {file_path}")
-        data = func(*args, **kwargs)
-        print(f"Finished loading file: {file_path}")
-        print('-'*80)
-        return data
-    return wrapper
+_io_hooks = []
+_logger = logging.getLogger("file_operations_mn")
+
+
+def add_io_hook(hook: callable) -> None:
+    """ hook(event: IOEvent) is called after every decorated load/save, e.g. to record metrics"""
+    if hook not in _io_hooks:
+        _io_hooks.append(hook)
+    return None
+
+
+def remove_io_hook(hook: callable) -> None:
+    if hook in _io_hooks:
+        _io_hooks.remove(hook)
+    return None
+
+
+def clear_io_hooks() -> None:
+    _io_hooks.clear()
+    return None
+
+
+def set_printing(enabled: bool) -> None:
+    """ The global switch for the old behaviour, printing a banner to stdout for every load/save"""
+    if enabled:
+        add_io_hook(print_hook)
+    else:
+        remove_io_hook(print_hook)
+    return None
+
+
+def set_logging(enabled: bool) -> None:
+    """ Sends every event to the 'file_operations_mn' logger at DEBUG level"""
+    if enabled:
+        add_io_hook(logging_hook)
+    else:
+        remove_io_hook(logging_hook)
+    return None
+
+
+def print_hook(event: IOEvent) -> None:
+    print('-' * 80)
+    print(f"Finished {event.operation} on file: {event.path} "
+          f"({event.rows} rows, {event.bytes} bytes, {event.elapsed:.6f}s)")
+    print('-' * 80)
+    return None
+
+
+def logging_hook(event: IOEvent) -> None:
+    _logger.debug("%s %s: %s rows, %s bytes, %.6fs", event.operation, event.path, event.rows, event.bytes,
+                  event.elapsed)
+    return None
+
+
+def load_print_decorator(func: callable) -> callable:
+    return io_event_decorator(is_save=False)(func)
 
 
 def save_print_decorator(func: callable) -> callable:
-    type_return = Any
+    return io_event_decorator(is_save=True)(func)
+
+
+def io_event_decorator(operation: str = None, is_save=False, measure: callable = None) -> callable:
+    """ Emits an IOEvent to the hooks after each call. Silent unless a hook is registered, the only cost then is
+    checking the hook list.
+
+    Works on methods of objects with a file_path, and on functions taking the file path as their first argument.
+    measure(args, kwargs, result) -> (rows, bytes) overrides the defaults, the length of the list loaded or saved and
+    the file size. Partial loads should pass one, the default never walks the data to count its bytes.
+    """
+    def decorator(func: callable) -> callable:
+        operation_name = operation or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _io_hooks:
+                return func(*args, **kwargs)
+
+            start = time.perf_counter()
+            data = func(*args, **kwargs)
+            elapsed = time.perf_counter() - start
+
+            file_path = args[0] if isinstance(args[0], str) else args[0].file_path
+            if measure is not None:
+                rows, number_of_bytes = measure(args, kwargs, data)
+            elif is_save:
+                saved = args[1] if len(args) > 1 else next(iter(kwargs.values()), None)
+                rows, number_of_bytes = _rows_of(saved), file_size_or_none(file_path)
+            else:
+                rows, number_of_bytes = _rows_of(data), file_size_or_none(file_path)
+
+            event = IOEvent(file_path, operation_name, number_of_bytes, rows, elapsed, is_save)
+            for hook in tuple(_io_hooks):
+                hook(event)
+            return data
+        return wrapper
+    return decorator
+
+
+def _rows_of(data) -> int | None:
+    if isinstance(data, list):
+        return len(data)
+    return None
+
 
+def file_size_or_none(file_path: str) -> int | None:
     try:
-        type_return = func.__annotations__["return"]
-    except KeyError:
-        pass
-
-    def wrapper(*args, **kwargs) -> type_return:
-        file_path = args[0].file_path
-        print('-' * 80)
-        print(f"Saving to file: {file_path}")
-        data = func(*args, **kwargs)
-        print(f"Finished saving to file: {file_path}")
-        print('-' * 80)
-        return data
-    return wrapper
+        return os.path.getsize(file_path)
+    except OSError:
+        return None
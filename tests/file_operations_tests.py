@@ -1,13 +1,38 @@
+import asyncio
+import contextlib
+import gc
+import gzip
+import importlib.util
+import io
+import json
+import multiprocessing
 import os
+import tempfile
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
 
-from file_operations_mn.path_string_utilities import parent_path, is_path_of_extension
+from file_operations_mn.path_string_utilities import (parent_path, is_path_of_extension, compression_suffix,
+                                                      file_path_without_compression, file_path_extension,
+                                                      file_path_without_extension, path_parent_dir_only_parent,
+                                                      file_path_extensions, file_paths_without_extension,
+                                                      parent_paths, PathInfo)
 from file_operations_mn.file_utilities_read import (count_file_lines, max_file_index_in_dir, files_in_dir,
-                                                    file_exists, immediate_subdirs)
-from file_operations_mn.file_utilities_write import trim_end_of_file_blank_line, make_blank_file, make_empty_file
+                                                    file_exists, immediate_subdirs, walk_dir, discover_files,
+                                                    COUNT_STRATEGIES)
+from file_operations_mn.file_utilities_write import (trim_end_of_file_blank_line, trim_end_of_file_blank_lines,
+                                                     make_blank_file, make_empty_file, open_for_save,
+                                                     DURABILITY_LEVELS)
 from file_operations_mn.file_exceptions import InvalidPathError, FileEmptyError
-from file_operations_mn.file_writers import CSV_Writer
+from file_operations_mn.printing_decorators import add_io_hook, remove_io_hook, set_printing
+from file_operations_mn.io_metrics import measure_io
+from file_operations_mn.file_writers import (CSV_Writer, JSON_FileReader, JSON_LinesFileReader, TXT_FileReader,
+                                             TextWriterSingleLine)
+from file_operations_mn.file_compression import COMPRESSION_OPENERS
+from file_operations_mn.csv_sampler import CSV_BatchSampler
+from file_operations_mn.directory_index import DirectoryIndex
+from file_operations_mn.json_state_store import JSON_StateStore
 
 
 class TestTeardownFile:
@@ -26,6 +51,16 @@ class TestTeardownFile:
         self.__delete()
 
 
+def append_rows_locked(file_path: str, worker_id: int, number_of_rows: int, rows_per_batch: int) -> None:
+    """ Stress test worker, every row is long enough that a torn write would show up"""
+    csv_writer = CSV_Writer(file_path, header=("worker", "row", "payload"))
+    for batch_start in range(0, number_of_rows, rows_per_batch):
+        csv_writer.append_lines([[str(worker_id), str(row), str(worker_id) * 300]
+                                 for row in range(batch_start, min(batch_start + rows_per_batch, number_of_rows))],
+                                locked=True)
+    return None
+
+
 class TestFilePathOfExtension(unittest.TestCase):
     def test_txt_is_txt_returnTrue(self):
         self.assertTrue(is_path_of_extension("test.txt", ".txt"))
@@ -116,6 +151,36 @@ class TestCountLines(unittest.TestCase):
                 count_file_lines(test_path)
 
 
+class TestCountLinesStrategies(unittest.TestCase):
+    test_path = "test.txt"
+
+    def test_all_strategies_agree_on_blank_files(self):
+        cases = [(10, 2, 12), (10, 1, 11), (1, 2, 3), (1, 1, 2), (0, 1, 1), (0, 0, 1)]
+        for num_lines_non_blank, num_lines_blank, correct_lines in cases:
+            with TestTeardownFile(self.test_path):
+                make_blank_file(self.test_path, num_lines_non_blank, num_lines_blank)
+                for strategy in COUNT_STRATEGIES:
+                    self.assertEqual(correct_lines, count_file_lines(self.test_path, strategy=strategy))
+
+    def test_small_chunks_across_workers(self):
+        with TestTeardownFile(self.test_path):
+            make_blank_file(self.test_path, 200, 3)
+            for strategy in COUNT_STRATEGIES:
+                self.assertEqual(203, count_file_lines(self.test_path, strategy=strategy, workers=3, chunk_size=64))
+
+    def test_unknown_strategy_raises_error(self):
+        with TestTeardownFile(self.test_path):
+            make_empty_file(self.test_path)
+            with self.assertRaises(ValueError):
+                count_file_lines(self.test_path, strategy="unknown")
+
+    def test_file_not_exists_raises_error(self):
+        with TestTeardownFile(self.test_path):
+            for strategy in COUNT_STRATEGIES:
+                with self.assertRaises(FileNotFoundError):
+                    count_file_lines(self.test_path, strategy=strategy)
+
+
 class TestTrimEmptyLines(unittest.TestCase):
     """ Relies on TestCountLines to pass all tests."""
 
@@ -201,6 +266,42 @@ class TestTrimEmptyLines(unittest.TestCase):
             self.assertEqual(10, count_file_lines(test_path))
 
 
+class TestTrimEmptyLinesInPlace(unittest.TestCase):
+    def test_crlf_line_endings(self):
+        test_path = "test.txt"
+
+        with TestTeardownFile(test_path):
+            with open(test_path, 'wb') as file:
+                file.write(b"a\r\nb\r\n\r\n\n")
+            trim_end_of_file_blank_line(test_path)
+
+            with open(test_path, 'rb') as file:
+                self.assertEqual(file.read(), b"a\r\nb")
+
+    def test_carriage_returns_trimmed_like_universal_newlines(self):
+        test_path = "test.txt"
+
+        for data, expected in ((b"a\r", b"a"), (b"a\r\n\r", b"a"), (b"a\r\r\n\n", b"a"), (b"\r\n\n", b"")):
+            with self.subTest(data=data), TestTeardownFile(test_path):
+                with open(test_path, 'wb') as file:
+                    file.write(data)
+                trim_end_of_file_blank_line(test_path)
+
+                with open(test_path, 'rb') as file:
+                    self.assertEqual(file.read(), expected)
+
+    def test_trim_many_files(self):
+        test_paths = [f"test{i}.txt" for i in range(4)]
+
+        with contextlib.ExitStack() as stack:
+            for test_path in test_paths:
+                stack.enter_context(TestTeardownFile(test_path))
+                make_blank_file(test_path, 10, 3)
+            trim_end_of_file_blank_lines(test_paths, max_workers=2)
+            for test_path in test_paths:
+                self.assertEqual(10, count_file_lines(test_path))
+
+
 class TestParentDirPath(unittest.TestCase):
     def test_flat_file(self):
         test_path = "test_path.csv"
@@ -223,6 +324,44 @@ class TestParentDirPath(unittest.TestCase):
         with self.assertRaises(InvalidPathError):
             parent_path(test_path)
 
+    def test_backslash_separators(self):
+        self.assertEqual(parent_path("dir2\\dir1/test_path.csv", 2), "dir2")
+        self.assertEqual(parent_path("dir2/dir1\\test_path.csv"), "dir2/dir1")
+
+    def test_too_many_levels(self):
+        with self.assertRaises(InvalidPathError):
+            parent_path("a/b.csv", 3)
+        self.assertEqual(parent_path("test_path.csv", 3), "test_path.csv")
+
+    def test_only_parent(self):
+        self.assertEqual(path_parent_dir_only_parent("dir3/dir2\\dir1/test_path.csv"), "dir1")
+        self.assertEqual(path_parent_dir_only_parent("dir1/test_path.csv"), "dir1/test_path.csv")
+        with self.assertRaises(InvalidPathError):
+            path_parent_dir_only_parent("/")
+
+
+class TestFilePathExtension(unittest.TestCase):
+    def test_extension(self):
+        self.assertEqual(file_path_extension("dir.d/test.csv.gz"), ".gz")
+        with self.assertRaises(InvalidPathError):
+            file_path_extension("dir/test")
+
+    def test_without_extension(self):
+        self.assertEqual(file_path_without_extension("dir.d/test.csv"), "dir.d/test")
+        # A 1 character extension has always been rejected too.
+        for invalid_path in ("test", "test.", "test.a.", "test.c"):
+            with self.assertRaises(InvalidPathError):
+                file_path_without_extension(invalid_path)
+
+    def test_batches_match_single_calls(self):
+        file_paths = ["a/1.csv", "b\\c/2.txt", "3.json"]
+        self.assertEqual(file_path_extensions(file_paths), [file_path_extension(path) for path in file_paths])
+        self.assertEqual(file_paths_without_extension(iter(file_paths)),
+                         [file_path_without_extension(path) for path in file_paths])
+        self.assertEqual(parent_paths(file_paths), ["a", "b\\c", "3.json"])
+        with self.assertRaises(InvalidPathError):
+            file_path_extensions(["a.csv", "b"])
+
 
 class TestCSV_Writer(unittest.TestCase):
     test_path = "test_csv_writer.csv"
@@ -436,6 +575,35 @@ class TestCSV_Writer(unittest.TestCase):
             self.assertEqual(loaded_data4, [['0', '1']])
             self.assertEqual(loaded_data5, [['0', '1'], ['1', '2']])
 
+    def test_load_sequential_handle_closed_with_the_writer(self):
+        data_initial = [[str(i), str(i + 1)] for i in range(3)]
+
+        with TestTeardownFile(self.test_path):
+            csv_writer = CSV_Writer(self.test_path)
+            csv_writer.write(data_initial)
+            csv_writer.load_sequential(2)
+            sequential_file = csv_writer._sequential_file
+
+            del csv_writer
+            gc.collect()
+            self.assertTrue(sequential_file.closed)
+
+    def test_reassigned_file_path_is_counted_again(self):
+        other_path = "test_other.csv"
+
+        with TestTeardownFile(self.test_path), TestTeardownFile(other_path):
+            CSV_Writer(other_path).write([['1', '2']])
+            csv_writer = CSV_Writer(self.test_path)
+            csv_writer.write([[str(i), str(i + 1)] for i in range(3)])
+            self.assertEqual(len(csv_writer), 3)
+            csv_writer.load_sequential(1)
+
+            csv_writer.file_path = other_path
+            self.assertEqual(len(csv_writer), 1)
+            self.assertEqual(csv_writer.load_sequential(1), [['1', '2']])
+            with self.assertRaises(ValueError):
+                csv_writer.load_line(2)
+
     def test_auto_header(self):
         data_initial = [[str(i) for i in range(2)] for _ in range(2)]
         header = ["col1", "col2"]
@@ -482,6 +650,1058 @@ class TestCSV_Writer(unittest.TestCase):
                 CSV_Writer(self.test_path, header="$auto")
 
 
+class TestCSV_WriterLineIndex(unittest.TestCase):
+    test_path = "test_csv_writer_index.csv"
+    sidecar_path = "test_csv_writer_index.csv.idx"
+
+    def test_load_line_with_memory_index(self):
+        data_initial = [[str(i), str(i + 1)] for i in range(5)]
+        header = ("col1", "col2")
+
+        with TestTeardownFile(self.test_path):
+            csv_writer = CSV_Writer(self.test_path, header, line_index="memory")
+            csv_writer.write(data_initial)
+
+            with self.assertRaises(ValueError):
+                csv_writer.load_line(5)
+
+            self.assertEqual(csv_writer.load_line(0), [data_initial[0]])
+            self.assertEqual(csv_writer.load_line(4), [data_initial[4]])
+            self.assertEqual(csv_writer.load_range(1, 4), data_initial[1:4])
+
+    def test_index_follows_append_and_remove(self):
+        data_initial = [[str(i), str(i + 1)] for i in range(3)]
+
+        with TestTeardownFile(self.test_path):
+            csv_writer = CSV_Writer(self.test_path, line_index="memory")
+            csv_writer.write(data_initial)
+            csv_writer.append_lines([['7', '8']])
+
+            self.assertEqual(len(csv_writer), 4)
+            self.assertEqual(csv_writer.load_line(3), [['7', '8']])
+
+            csv_writer.remove_last_line()
+            self.assertEqual(len(csv_writer), 3)
+            self.assertEqual(csv_writer.load_range(0, 3), data_initial)
+
+    def test_sidecar_index_is_reused(self):
+        data_initial = [[str(i), str(i + 1)] for i in range(3)]
+
+        with TestTeardownFile(self.test_path), TestTeardownFile(self.sidecar_path):
+            csv_writer = CSV_Writer(self.test_path, line_index="sidecar")
+            csv_writer.write(data_initial)
+            self.assertTrue(file_exists(self.sidecar_path))
+
+            csv_writer.append_lines([['7', '8']])
+
+            reopened_writer = CSV_Writer(self.test_path, line_index="sidecar")
+            self.assertEqual(len(reopened_writer.line_index._offsets), 4)
+            self.assertEqual(reopened_writer.load_line(3), [['7', '8']])
+            self.assertIsNone(CSV_Writer(self.test_path).line_index)
+
+    def test_index_sees_longer_rewrite(self):
+        with TestTeardownFile(self.test_path), TestTeardownFile(self.sidecar_path):
+            with open(self.test_path, 'w') as file:
+                file.write("a|b\nc|d\n")
+            for line_index in ("memory", "sidecar"):
+                csv_writer = CSV_Writer(self.test_path, line_index=line_index)
+                self.assertEqual(csv_writer.load_line(1), [['c', 'd']])
+
+                with open(self.test_path, 'w') as file:
+                    file.write("xxxx|y\nzzzz|w\nx|vvvv\n")
+                self.assertEqual(csv_writer.load_range(0, 3), [['xxxx', 'y'], ['zzzz', 'w'], ['x', 'vvvv']])
+
+                with open(self.test_path, 'w') as file:
+                    file.write("a|b\nc|d\n")
+
+
+class TestCSV_WriterLineCount(unittest.TestCase):
+    test_path = "test_csv_writer_count.csv"
+
+    def test_len_matches_count_file_lines(self):
+        data_initial = [[str(i), str(i + 1)] for i in range(4)]
+        header = ("col1", "col2")
+
+        with TestTeardownFile(self.test_path):
+            csv_writer = CSV_Writer(self.test_path, header)
+            csv_writer.write(data_initial)
+            self.assertEqual(len(csv_writer), count_file_lines(self.test_path) - 1)
+
+            csv_writer.append_lines(data_initial)
+            self.assertEqual(len(csv_writer), count_file_lines(self.test_path) - 1)
+
+            csv_writer.remove_last_line()
+            self.assertEqual(len(csv_writer), count_file_lines(self.test_path) - 1)
+
+    def test_len_sees_external_append(self):
+        data_initial = [[str(i), str(i + 1)] for i in range(4)]
+
+        with TestTeardownFile(self.test_path):
+            csv_writer = CSV_Writer(self.test_path)
+            csv_writer.write(data_initial)
+            self.assertEqual(len(csv_writer), 4)
+
+            with open(self.test_path, 'a') as file:
+                file.write("8|9\n")
+
+            self.assertEqual(len(csv_writer), 5)
+
+    def test_len_sees_external_rewrite(self):
+        data_initial = [[str(i), str(i + 1)] for i in range(4)]
+
+        with TestTeardownFile(self.test_path):
+            csv_writer = CSV_Writer(self.test_path)
+            csv_writer.write(data_initial)
+            self.assertEqual(len(csv_writer), 4)
+
+            with open(self.test_path, 'w') as file:
+                file.write("8|9\n")
+
+            self.assertEqual(len(csv_writer), 1)
+
+    def test_len_sees_longer_external_rewrite(self):
+        with TestTeardownFile(self.test_path):
+            with open(self.test_path, 'w') as file:
+                file.write("a|b\nc|d\n")
+            csv_writer = CSV_Writer(self.test_path)
+            self.assertEqual(len(csv_writer), 2)
+
+            with open(self.test_path, 'w') as file:
+                file.write("xxxxxxxxxxxxxxxxxxx|y\n")
+            self.assertEqual(len(csv_writer), 1)
+
+
+class TestCSV_WriterIterators(unittest.TestCase):
+    test_path = "test_csv_writer_iter.csv"
+
+    def test_iter_rows_matches_load_all(self):
+        data_initial = [[str(i), str(i + 1)] for i in range(5)]
+        header = ("col1", "col2")
+
+        with TestTeardownFile(self.test_path):
+            csv_writer = CSV_Writer(self.test_path, header)
+            csv_writer.write(data_initial)
+
+            self.assertEqual(list(csv_writer.iter_rows()), csv_writer.load_all())
+            self.assertEqual(list(csv_writer.iter_rows(as_float=True)), csv_writer.load_all(as_float=True))
+
+    def test_iter_rows_from_start_index(self):
+        data_initial = [[str(i), str(i + 1)] for i in range(5)]
+        header = ("col1", "col2")
+
+        with TestTeardownFile(self.test_path):
+            for line_index in (None, "memory"):
+                csv_writer = CSV_Writer(self.test_path, header, line_index=line_index)
+                csv_writer.write(data_initial)
+
+                self.assertEqual(list(csv_writer.iter_rows(start_index=3)), data_initial[3:])
+                self.assertEqual(list(csv_writer.iter_rows(start_index=5)), [])
+
+    def test_iter_batches(self):
+        data_initial = [[str(i), str(i + 1)] for i in range(5)]
+
+        with TestTeardownFile(self.test_path):
+            csv_writer = CSV_Writer(self.test_path)
+            csv_writer.write(data_initial)
+
+            batches = list(csv_writer.iter_batches(2, start_index=1))
+            self.assertEqual(batches, [data_initial[1:3], data_initial[3:5]])
+
+            with self.assertRaises(ValueError):
+                next(csv_writer.iter_batches(0))
+
+
+class TestCSV_WriterSequentialCursor(unittest.TestCase):
+    test_path = "test_csv_writer_cursor.csv"
+
+    def test_cursor_survives_append(self):
+        data_initial = [[str(i), str(i + 1)] for i in range(3)]
+        header = ("col1", "col2")
+
+        with TestTeardownFile(self.test_path):
+            with CSV_Writer(self.test_path, header) as csv_writer:
+                csv_writer.write(data_initial)
+
+                self.assertEqual(csv_writer.load_sequential(2), data_initial[:2])
+                csv_writer.append_lines([['7', '8']])
+                self.assertEqual(csv_writer.load_sequential(3), [data_initial[2], ['7', '8'], data_initial[0]])
+                self.assertEqual(csv_writer._batch_index, 1)
+
+    def test_cursor_reopens_at_batch_index_after_write(self):
+        data_initial = [[str(i), str(i + 1)] for i in range(4)]
+
+        with TestTeardownFile(self.test_path):
+            for line_index in (None, "memory"):
+                csv_writer = CSV_Writer(self.test_path, line_index=line_index)
+                csv_writer.write(data_initial)
+
+                csv_writer.load_sequential(1)
+                csv_writer.write(data_initial)
+                self.assertEqual(csv_writer.load_sequential(2), data_initial[1:3])
+
+                csv_writer.close()
+                self.assertEqual(csv_writer.load_sequential(2), [data_initial[3], data_initial[0]])
+                self.assertEqual(csv_writer.load_sequential(1, from_start=True), [data_initial[0]])
+                csv_writer.close()
+
+
+class TestCSV_BatchSampler(unittest.TestCase):
+    test_path = "test_csv_sampler.csv"
+
+    def test_epoch_covers_every_row_once(self):
+        data_initial = [[str(i), str(i + 1)] for i in range(10)]
+        header = ("col1", "col2")
+
+        with TestTeardownFile(self.test_path):
+            csv_writer = CSV_Writer(self.test_path, header)
+            csv_writer.write(data_initial)
+
+            sampler = CSV_BatchSampler(csv_writer, 3, seed=7)
+            batches = list(sampler)
+
+            self.assertEqual(len(batches), len(sampler))
+            self.assertEqual([len(batch) for batch in batches], [3, 3, 3, 1])
+            self.assertEqual(sorted(row for batch in batches for row in batch), sorted(data_initial))
+
+    def test_seeded_epochs_repeat_and_differ(self):
+        data_initial = [[str(i), str(i + 1)] for i in range(20)]
+
+        with TestTeardownFile(self.test_path):
+            csv_writer = CSV_Writer(self.test_path)
+            csv_writer.write(data_initial)
+
+            sampler = CSV_BatchSampler(csv_writer, 4, seed=3, drop_last=True)
+            epoch0 = list(sampler.iter_epoch(0))
+
+            self.assertEqual(epoch0, list(CSV_BatchSampler(csv_writer, 4, seed=3).iter_epoch(0)))
+            self.assertNotEqual(epoch0, list(sampler.iter_epoch(1)))
+
+    def test_invalid_batch_size_raises_error(self):
+        with TestTeardownFile(self.test_path):
+            csv_writer = CSV_Writer(self.test_path)
+            csv_writer.write([['1', '2']])
+            with self.assertRaises(ValueError):
+                CSV_BatchSampler(csv_writer, 0)
+
+
+class TestCSV_WriterNumeric(unittest.TestCase):
+    test_path = "test_csv_writer_numeric.csv"
+
+    def test_load_numeric_matches_load_all_as_float(self):
+        data_initial = [[str(i * 0.5), str(-i), "1e3"] for i in range(50)]
+        header = ("col1", "col2", "col3")
+
+        with TestTeardownFile(self.test_path):
+            csv_writer = CSV_Writer(self.test_path, header)
+            csv_writer.write(data_initial)
+            csv_writer.append_lines(data_initial)
+
+            values, shape = csv_writer.load_numeric(chunk_size=64)
+            rows = csv_writer.load_all(as_float=True)
+
+            self.assertEqual(shape, (100, 3))
+            self.assertEqual(list(values), [element for row in rows for element in row])
+
+    def test_load_numeric_columns(self):
+        data_initial = [[str(i), str(i * 2)] for i in range(5)]
+
+        with TestTeardownFile(self.test_path):
+            csv_writer = CSV_Writer(self.test_path)
+            csv_writer.write(data_initial)
+
+            columns = csv_writer.load_numeric_columns()
+            self.assertEqual([list(column) for column in columns],
+                             [[float(i) for i in range(5)], [float(i * 2) for i in range(5)]])
+
+    def test_load_numeric_ragged_rows_raises_error(self):
+        with TestTeardownFile(self.test_path):
+            csv_writer = CSV_Writer(self.test_path)
+            csv_writer.write([['1', '2'], ['3']])
+            with self.assertRaises(ValueError):
+                csv_writer.load_numeric()
+
+    def test_load_numeric_rejects_what_load_all_rejects(self):
+        for text in ("1|2|3\n4||5\n6|7|8|9\n", "1|2\n3|x\n", "1|2\n3|4\n5|"):
+            with self.subTest(text=text), TestTeardownFile(self.test_path):
+                with open(self.test_path, 'w') as file:
+                    file.write(text)
+                csv_writer = CSV_Writer(self.test_path)
+                with self.assertRaises(ValueError):
+                    csv_writer.load_all(as_float=True)
+                with self.assertRaises(ValueError):
+                    csv_writer.load_numeric(chunk_size=4)
+
+    def test_load_numpy(self):
+        data_initial = [[str(i), str(i * 2)] for i in range(5)]
+
+        with TestTeardownFile(self.test_path):
+            csv_writer = CSV_Writer(self.test_path)
+            csv_writer.write(data_initial)
+
+            if importlib.util.find_spec("numpy") is None:
+                with self.assertRaises(ModuleNotFoundError):
+                    csv_writer.load_numpy()
+                return None
+
+            self.assertEqual(csv_writer.load_numpy().tolist(), csv_writer.load_all(as_float=True))
+
+
+class TestCSV_WriterParallelLoad(unittest.TestCase):
+    test_path = "test_csv_writer_parallel.csv"
+
+    def test_parallel_load_keeps_row_order(self):
+        data_initial = [[str(i), str(i * 2)] for i in range(500)]
+        header = ("col1", "col2")
+
+        with TestTeardownFile(self.test_path):
+            csv_writer = CSV_Writer(self.test_path, header)
+            csv_writer.write(data_initial)
+
+            self.assertEqual(csv_writer.load_all(workers=3, chunk_size=256), data_initial)
+            self.assertEqual(csv_writer.load_all(as_float=True, workers=3, chunk_size=256),
+                             csv_writer.load_all(as_float=True))
+
+    def test_parallel_load_without_header(self):
+        data_initial = [[str(i), str(i * 2)] for i in range(100)]
+
+        with TestTeardownFile(self.test_path):
+            csv_writer = CSV_Writer(self.test_path)
+            csv_writer.write(data_initial)
+            csv_writer.append_lines(data_initial)
+
+            self.assertEqual(csv_writer.load_all(workers=2, chunk_size=100), data_initial * 2)
+
+
+class TestRemoveLastLines(unittest.TestCase):
+    test_path = "test_remove_lines.csv"
+
+    def test_remove_last_lines(self):
+        data_initial = [[str(i), str(i + 1)] for i in range(5)]
+        header = ("col1", "col2")
+
+        with TestTeardownFile(self.test_path):
+            csv_writer = CSV_Writer(self.test_path, header)
+            csv_writer.write(data_initial)
+
+            csv_writer.remove_last_lines(2)
+            self.assertEqual(csv_writer.load_all(), data_initial[:3])
+            self.assertEqual(len(csv_writer), count_file_lines(self.test_path) - 1)
+
+            csv_writer.append_lines(data_initial[3:])
+            self.assertEqual(csv_writer.load_all(), data_initial)
+
+    def test_remove_more_lines_than_exist_empties_file(self):
+        with TestTeardownFile(self.test_path):
+            csv_writer = CSV_Writer(self.test_path)
+            csv_writer.write([['1', '2'], ['3', '4']])
+
+            csv_writer.remove_last_lines(5)
+            self.assertTrue(csv_writer.is_empty)
+            self.assertEqual(len(csv_writer), 0)
+
+    def test_unterminated_last_line_counts_as_a_line(self):
+        with TestTeardownFile(self.test_path):
+            with open(self.test_path, 'w') as file:
+                file.write("1|2\n3|4\n5|6")
+
+            csv_writer = CSV_Writer(self.test_path)
+            csv_writer.remove_last_line()
+            self.assertEqual(csv_writer.load_all(), [['1', '2'], ['3', '4']])
+            self.assertEqual(len(csv_writer), 2)
+
+    def test_remove_from_empty_file_warns(self):
+        with TestTeardownFile(self.test_path):
+            make_empty_file(self.test_path)
+            csv_writer = CSV_Writer(self.test_path)
+            with self.assertWarns(UserWarning):
+                csv_writer.remove_last_line()
+
+
+class TestCSV_Appender(unittest.TestCase):
+    test_path = "test_csv_appender.csv"
+
+    def test_buffered_appends_match_append_lines(self):
+        data_initial = [[str(i), str(i + 1)] for i in range(10)]
+        header = ("col1", "col2")
+
+        with TestTeardownFile(self.test_path):
+            csv_writer = CSV_Writer(self.test_path, header)
+            with csv_writer.appender(max_rows=4) as appender:
+                for line in data_initial:
+                    appender.append_lines([line])
+
+            self.assertEqual(csv_writer.load_all(), data_initial)
+            self.assertEqual(CSV_Writer(self.test_path, "$auto").header, list(header))
+
+    def test_max_bytes_counts_encoded_bytes(self):
+        data_initial = [['1', '2']]
+
+        with TestTeardownFile(self.test_path):
+            csv_writer = CSV_Writer(self.test_path)
+            csv_writer.write(data_initial)
+
+            # 5 characters with the delimiter and newline, but 8 bytes in UTF-8.
+            with csv_writer.appender(max_bytes=8) as appender:
+                appender.append_lines([['\u00e9', '\u00e9\u00e9']])
+                self.assertEqual(len(csv_writer), 2)
+
+    def test_rows_are_buffered_until_threshold(self):
+        data_initial = [[str(i), str(i + 1)] for i in range(3)]
+
+        with TestTeardownFile(self.test_path):
+            csv_writer = CSV_Writer(self.test_path)
+            csv_writer.write(data_initial)
+
+            with csv_writer.appender(max_rows=3) as appender:
+                appender.append_lines(data_initial[:2])
+                self.assertEqual(len(csv_writer), 3)
+
+                appender.append_lines(data_initial[2:])
+                self.assertEqual(len(csv_writer), 6)
+
+                appender.append_lines(data_initial[:1])
+            self.assertEqual(csv_writer.load_all(), data_initial * 2 + data_initial[:1])
+
+    def test_flush_interval(self):
+        with TestTeardownFile(self.test_path):
+            csv_writer = CSV_Writer(self.test_path)
+            csv_writer.write([['0', '1']])
+
+            with csv_writer.appender(max_rows=100, flush_interval=0) as appender:
+                appender.append_lines([['1', '2']])
+                self.assertEqual(len(csv_writer), 2)
+
+    def test_empty_lines_are_not_buffered(self):
+        with TestTeardownFile(self.test_path):
+            csv_writer = CSV_Writer(self.test_path)
+            with csv_writer.appender() as appender:
+                with self.assertWarns(UserWarning):
+                    appender.append_lines([[]])
+            self.assertFalse(file_exists(self.test_path))
+
+
+class TestConcurrentAppends(unittest.TestCase):
+    test_path = "test_concurrent_appends.csv"
+
+    def test_processes_do_not_lose_or_tear_rows(self):
+        number_of_workers = 4
+        number_of_rows = 300
+
+        with TestTeardownFile(self.test_path):
+            workers = [multiprocessing.Process(target=append_rows_locked,
+                                               args=(self.test_path, worker_id, number_of_rows, 7))
+                       for worker_id in range(number_of_workers)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+                self.assertEqual(worker.exitcode, 0)
+
+            csv_writer = CSV_Writer(self.test_path, "$auto")
+            self.assertEqual(csv_writer.header, ["worker", "row", "payload"])
+
+            rows = csv_writer.load_all()
+            self.assertEqual(len(rows), number_of_workers * number_of_rows)
+            for worker_id, row, payload in rows:
+                self.assertEqual(payload, worker_id * 300)
+            self.assertEqual({(int(worker_id), int(row)) for worker_id, row, _ in rows},
+                             {(worker_id, row) for worker_id in range(number_of_workers)
+                              for row in range(number_of_rows)})
+
+    def test_threads_with_locked_appender(self):
+        def append_with_appender(worker_id: int) -> None:
+            with CSV_Writer(self.test_path, header=("worker", "row")).appender(max_rows=16, locked=True) as appender:
+                for row in range(100):
+                    appender.append_lines([[str(worker_id), str(row)]])
+
+        with TestTeardownFile(self.test_path):
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                list(executor.map(append_with_appender, range(4)))
+
+            rows = CSV_Writer(self.test_path, "$auto").load_all()
+            self.assertEqual(sorted(rows), sorted([str(worker_id), str(row)]
+                                                  for worker_id in range(4) for row in range(100)))
+
+
+class TestAsyncFileReaders(unittest.TestCase):
+    csv_test_path = "test_async.csv"
+    json_test_path = "test_async.json"
+
+    def test_concurrent_asaves_are_coalesced(self):
+        json_reader = JSON_FileReader(self.json_test_path)
+        saved = []
+        save = json_reader.save
+
+        def counting_save(data: dict) -> None:
+            saved.append(data)
+            save(data)
+
+        json_reader.save = counting_save
+
+        async def save_many() -> None:
+            await asyncio.gather(*(json_reader.asave({"version": i}) for i in range(20)))
+
+        with TestTeardownFile(self.json_test_path):
+            asyncio.run(save_many())
+            self.assertLess(len(saved), 20)
+            self.assertEqual(saved[-1], {"version": 19})
+            self.assertEqual(asyncio.run(json_reader.aload()), {"version": 19})
+
+    def test_aappend_lines_and_aiter_rows(self):
+        data_initial = [[str(i), str(i + 1)] for i in range(10)]
+        header = ("col1", "col2")
+
+        async def append_then_read() -> list:
+            csv_writer = CSV_Writer(self.csv_test_path, header)
+            await asyncio.gather(*(csv_writer.aappend_lines([line]) for line in data_initial))
+            return [row async for row in csv_writer.aiter_rows(start_index=2, batch_size=3)]
+
+        with TestTeardownFile(self.csv_test_path):
+            rows = asyncio.run(append_then_read())
+            self.assertEqual(len(rows), 8)
+            self.assertEqual(len(CSV_Writer(self.csv_test_path, header).load_all()), 10)
+
+
+class TestAtomicSave(unittest.TestCase):
+    test_path = "test_atomic.json"
+
+    def test_atomic_save_every_durability(self):
+        with TestTeardownFile(self.test_path):
+            for durability in DURABILITY_LEVELS:
+                json_reader = JSON_FileReader(self.test_path, atomic=True, durability=durability)
+                json_reader.save({"durability": durability})
+                self.assertEqual(json_reader.load(), {"durability": durability})
+            self.assertEqual([name for name in os.listdir('.') if name.startswith(f".{self.test_path}.")], [])
+
+    def test_failed_atomic_save_keeps_old_file(self):
+        with TestTeardownFile(self.test_path):
+            json_reader = JSON_FileReader(self.test_path, atomic=True)
+            json_reader.save({"version": 1})
+
+            with self.assertRaises(TypeError):
+                json_reader.save({"version": object()})
+
+            self.assertEqual(json_reader.load(), {"version": 1})
+            self.assertEqual([name for name in os.listdir('.') if name.startswith(f".{self.test_path}.")], [])
+
+    def test_atomic_csv_write_and_text_save(self):
+        data_initial = [[str(i), str(i + 1)] for i in range(3)]
+
+        with TestTeardownFile("test_atomic.csv"), TestTeardownFile("test_atomic.txt"):
+            csv_writer = CSV_Writer("test_atomic.csv", ("col1", "col2"), atomic=True, durability="file")
+            csv_writer.write(data_initial)
+            self.assertEqual(csv_writer.load_all(), data_initial)
+
+            text_writer = TextWriterSingleLine("test_atomic.txt", atomic=True)
+            text_writer.save("hello")
+            self.assertEqual(text_writer.load(), "hello")
+
+    def test_unknown_durability_raises_error(self):
+        with TestTeardownFile(self.test_path):
+            with self.assertRaises(ValueError):
+                with open_for_save(self.test_path, durability="always"):
+                    pass
+
+    def test_new_file_gets_the_permissions_of_open(self):
+        with TestTeardownFile(self.test_path), TestTeardownFile("test_atomic_plain.json"):
+            JSON_FileReader(self.test_path, atomic=True).save({})
+            JSON_FileReader("test_atomic_plain.json").save({})
+            self.assertEqual(os.stat(self.test_path).st_mode, os.stat("test_atomic_plain.json").st_mode)
+
+    def test_open_appender_follows_atomic_save(self):
+        with TestTeardownFile("test_atomic.csv"):
+            csv_writer = CSV_Writer("test_atomic.csv", atomic=True)
+            csv_writer.write([['0', '1']])
+            with csv_writer.appender(max_rows=1) as appender:
+                appender.append_lines([['1', '2']])
+                csv_writer.write([['2', '3']])
+                appender.append_lines([['3', '4']])
+            self.assertEqual(csv_writer.load_all(), [['2', '3'], ['3', '4']])
+
+
+class TestIOHooks(unittest.TestCase):
+    test_path = "test_io_hooks.csv"
+
+    def test_silent_by_default(self):
+        with TestTeardownFile(self.test_path):
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                csv_writer = CSV_Writer(self.test_path)
+                csv_writer.write([['1', '2'], ['3', '4']])
+                csv_writer.load_line(1)
+            self.assertEqual(output.getvalue(), "")
+
+    def test_printing_switch(self):
+        with TestTeardownFile(self.test_path):
+            output = io.StringIO()
+            set_printing(True)
+            try:
+                with contextlib.redirect_stdout(output):
+                    CSV_Writer(self.test_path).write([['1', '2']])
+            finally:
+                set_printing(False)
+            self.assertIn(f"Finished write on file: {self.test_path}", output.getvalue())
+
+    def test_hook_receives_events(self):
+        events = []
+        with TestTeardownFile(self.test_path):
+            add_io_hook(events.append)
+            try:
+                csv_writer = CSV_Writer(self.test_path, ("col1", "col2"), line_index="memory")
+                csv_writer.write([['1', '2'], ['3', '4']])
+                csv_writer.load_range(0, 2)
+                csv_writer.load_all()
+            finally:
+                remove_io_hook(events.append)
+
+            events = {event.operation: event for event in events}
+            self.assertEqual(events["write"].rows, 2)
+            self.assertEqual(events["write"].bytes, os.path.getsize(self.test_path))
+            self.assertTrue(events["write"].is_save)
+            load_range_event = events["load_range"]
+            self.assertEqual((load_range_event.path, load_range_event.rows, load_range_event.bytes),
+                             (self.test_path, 2, len(b"1|2\r\n3|4\r\n")))
+            self.assertGreaterEqual(load_range_event.elapsed, 0)
+            self.assertEqual((events["load_all"].rows, events["load_all"].bytes),
+                             (2, os.path.getsize(self.test_path)))
+
+    def test_unindexed_partial_load_reports_no_bytes(self):
+        events = []
+        with TestTeardownFile(self.test_path):
+            csv_writer = CSV_Writer(self.test_path)
+            csv_writer.write([['1', '2'], ['3', '4']])
+            add_io_hook(events.append)
+            try:
+                csv_writer.load_range(0, 2)
+            finally:
+                remove_io_hook(events.append)
+            self.assertEqual((events[0].rows, events[0].bytes), (2, None))
+
+
+class TestIOMetrics(unittest.TestCase):
+    test_path = "test_io_metrics.csv"
+
+    def test_measure_io_records_per_operation(self):
+        data_initial = [['1', '2'], ['3', '4']]
+
+        with TestTeardownFile(self.test_path):
+            with measure_io() as metrics:
+                csv_writer = CSV_Writer(self.test_path, line_index="memory")
+                csv_writer.write(data_initial)
+                csv_writer.append_lines(data_initial)
+                csv_writer.load_line(3)
+                csv_writer.load_all()
+                count_file_lines(self.test_path)
+
+            csv_writer.load_line(0)
+            snapshot = metrics.snapshot()
+
+            operations = snapshot[self.test_path]
+            self.assertEqual(operations["load_line"]["calls"], 1)
+            self.assertEqual(operations["load_line"]["rows"], 1)
+            self.assertEqual(operations["load_line"]["bytes_read"], 4)
+            self.assertEqual(operations["load_all"]["bytes_read"], os.path.getsize(self.test_path))
+            self.assertEqual(operations["append_lines"]["bytes_written"], 8)
+            self.assertEqual(operations["count_file_lines"]["rows"], 5)
+            self.assertIn("len", operations)
+            self.assertEqual(sum(operations["write"]["latency_histogram"].values()), 1)
+            self.assertEqual(json.loads(metrics.to_json()), snapshot)
+
+
+    def test_append_bytes_written_are_encoded_bytes(self):
+        with TestTeardownFile(self.test_path):
+            with measure_io() as metrics:
+                csv_writer = CSV_Writer(self.test_path, ("col1", "col2"))
+                csv_writer.append_lines([['\u00e9', '\u00e9\u00e9']])
+                csv_writer.append_lines([['\u00e9', '\u00e9\u00e9']])
+                csv_writer.append_lines([['\u00e9', '\u00e9\u00e9']], locked=True)
+
+            bytes_written = metrics.snapshot()[self.test_path]["append_lines"]["bytes_written"]
+            self.assertEqual(bytes_written, os.path.getsize(self.test_path))
+
+class TestJSON_Files(unittest.TestCase):
+    json_test_path = "test_json.json"
+    jsonl_test_path = "test_json_lines.jsonl"
+
+    def test_compact_save(self):
+        data = {"key": [1, 2, {"nested": "ü"}]}
+
+        with TestTeardownFile(self.json_test_path):
+            json_reader = JSON_FileReader(self.json_test_path, compact=True)
+            json_reader.save(data)
+
+            with open(self.json_test_path, 'r', encoding='utf-8') as file:
+                self.assertEqual(file.read(), '{"key":[1,2,{"nested":"ü"}]}')
+            self.assertEqual(json_reader.load(), data)
+
+    def test_json_lines_save_append_and_stream(self):
+        records = [{"id": i, "text": f"line\n{i}"} for i in range(5)]
+
+        with TestTeardownFile(self.jsonl_test_path):
+            json_lines_reader = JSON_LinesFileReader(self.jsonl_test_path)
+            json_lines_reader.save(records[:3])
+            json_lines_reader.append_records(iter(records[3:]))
+
+            self.assertEqual(len(json_lines_reader), 5)
+            self.assertEqual(json_lines_reader.load(), records)
+            self.assertEqual(list(json_lines_reader.iter_records(start_index=2)), records[2:])
+            self.assertEqual(list(json_lines_reader.iter_records(start_index=5)), [])
+
+    def test_json_lines_random_access(self):
+        records = [{"id": i} for i in range(5)]
+
+        with TestTeardownFile(self.jsonl_test_path), TestTeardownFile(self.jsonl_test_path + ".idx"):
+            JSON_LinesFileReader(self.jsonl_test_path, line_index="sidecar").save(records)
+
+            json_lines_reader = JSON_LinesFileReader(self.jsonl_test_path, line_index="sidecar")
+            self.assertEqual(json_lines_reader.load_record(3), {"id": 3})
+            with self.assertRaises(ValueError):
+                json_lines_reader.load_record(5)
+
+    def test_json_lines_blank_line_raises(self):
+        with TestTeardownFile(self.jsonl_test_path):
+            with open(self.jsonl_test_path, 'w', encoding='utf-8') as file:
+                file.write('{"a":1}\n\n{"a":2}\n')
+
+            json_lines_reader = JSON_LinesFileReader(self.jsonl_test_path)
+            self.assertEqual(len(json_lines_reader), 3)
+            self.assertEqual(json_lines_reader.load_record(2), {"a": 2})
+            self.assertEqual(list(json_lines_reader.iter_records(start_index=2)), [{"a": 2}])
+            for read in (json_lines_reader.load, lambda: json_lines_reader.load_record(1)):
+                with self.assertRaisesRegex(ValueError, "Blank line at record 1"):
+                    read()
+
+
+    def test_json_lines_reassigned_file_path(self):
+        other_path = "test_other.jsonl"
+
+        with TestTeardownFile(self.jsonl_test_path), TestTeardownFile(other_path):
+            JSON_LinesFileReader(other_path).save([{"b": 1}])
+            json_lines_reader = JSON_LinesFileReader(self.jsonl_test_path)
+            json_lines_reader.save([{"a": 1}, {"a": 2}])
+
+            json_lines_reader.file_path = other_path
+            self.assertEqual(len(json_lines_reader), 1)
+            self.assertEqual(json_lines_reader.load_record(0), {"b": 1})
+
+    def test_json_lines_unterminated_final_record(self):
+        with TestTeardownFile(self.jsonl_test_path):
+            with open(self.jsonl_test_path, 'w', encoding='utf-8') as file:
+                file.write('{"a":1}\n{"a":2}')
+
+            json_lines_reader = JSON_LinesFileReader(self.jsonl_test_path)
+            self.assertEqual(len(json_lines_reader), 2)
+            self.assertEqual(json_lines_reader.load_record(1), {"a": 2})
+            self.assertEqual(list(json_lines_reader.iter_records(start_index=1)), [{"a": 2}])
+            self.assertEqual(json_lines_reader.load(), [{"a": 1}, {"a": 2}])
+
+            json_lines_reader.append_records([{"a": 3}])
+            self.assertEqual(len(json_lines_reader), 3)
+            self.assertEqual(json_lines_reader.load(), [{"a": 1}, {"a": 2}, {"a": 3}])
+            self.assertEqual(json_lines_reader.load_record(2), {"a": 3})
+
+class TestJSON_StateStore(unittest.TestCase):
+    state_test_path = "test_state.json"
+    log_test_path = "test_state.json.log"
+
+    def test_updates_are_logged_and_replayed(self):
+        with TestTeardownFile(self.state_test_path), TestTeardownFile(self.log_test_path):
+            store = JSON_StateStore(self.state_test_path)
+            store["a"] = 1
+            store.update({"b": [2], "c": {"d": 3}})
+            del store["a"]
+
+            self.assertFalse(file_exists(self.state_test_path))
+            self.assertEqual(store.to_dict(), {"b": [2], "c": {"d": 3}})
+            with self.assertRaises(KeyError):
+                del store["a"]
+
+            reopened = JSON_StateStore(self.state_test_path)
+            self.assertEqual(reopened.to_dict(), {"b": [2], "c": {"d": 3}})
+            self.assertEqual(JSON_FileReader(self.state_test_path).load(), {"b": [2], "c": {"d": 3}})
+            self.assertEqual(os.path.getsize(self.log_test_path), 0)
+
+    def test_compacts_past_threshold(self):
+        with TestTeardownFile(self.state_test_path), TestTeardownFile(self.log_test_path):
+            store = JSON_StateStore(self.state_test_path, compact_threshold_bytes=200)
+            for i in range(20):
+                store[f"key_{i}"] = i
+
+            self.assertLess(os.path.getsize(self.log_test_path), 200)
+            self.assertEqual(len(JSON_FileReader(self.state_test_path).load()) + len(store.log_reader), 20)
+            self.assertEqual(JSON_StateStore(self.state_test_path).to_dict(), {f"key_{i}": i for i in range(20)})
+
+    def test_torn_log_record_is_ignored(self):
+        with TestTeardownFile(self.state_test_path), TestTeardownFile(self.log_test_path):
+            store = JSON_StateStore(self.state_test_path)
+            store["a"] = 1
+            with open(self.log_test_path, 'a', encoding='utf-8') as file:
+                file.write('{"op":"set","key":"b","val')
+
+            reopened = JSON_StateStore(self.state_test_path)
+            self.assertEqual(reopened.to_dict(), {"a": 1})
+            reopened["c"] = 2
+            self.assertEqual(JSON_StateStore(self.state_test_path).to_dict(), {"a": 1, "c": 2})
+
+    def test_corrupt_log_record_raises_and_keeps_log(self):
+        with TestTeardownFile(self.state_test_path), TestTeardownFile(self.log_test_path):
+            with open(self.log_test_path, 'w', encoding='utf-8') as file:
+                file.write('{"op":"set","key":"a","value":1}\ngarbage\n{"op":"set","key":"b","value":2}\n')
+            with open(self.log_test_path, 'rb') as file:
+                log = file.read()
+
+            with self.assertRaises(json.JSONDecodeError):
+                JSON_StateStore(self.state_test_path)
+            with open(self.log_test_path, 'rb') as file:
+                self.assertEqual(file.read(), log)
+
+    def test_unserialisable_update_writes_nothing(self):
+        with TestTeardownFile(self.state_test_path), TestTeardownFile(self.log_test_path):
+            store = JSON_StateStore(self.state_test_path)
+            store["a"] = 1
+            with self.assertRaises(TypeError):
+                store.update({"b": 2, "c": object()})
+            self.assertEqual(JSON_StateStore(self.state_test_path).to_dict(), {"a": 1})
+
+
+class TestCompressedFiles(unittest.TestCase):
+    def test_compression_suffix(self):
+        self.assertEqual(compression_suffix("data.csv.gz"), ".gz")
+        self.assertEqual(compression_suffix("data.json.bz2"), ".bz2")
+        self.assertIsNone(compression_suffix("data.csv"))
+        self.assertEqual(file_path_without_compression("data.txt.xz"), "data.txt")
+        self.assertEqual(file_path_without_compression("data.csv"), "data.csv")
+
+    def test_csv_round_trip_and_append(self):
+        for suffix in COMPRESSION_OPENERS:
+            csv_test_path = "test_compressed.csv" + suffix
+            with self.subTest(suffix=suffix), TestTeardownFile(csv_test_path):
+                csv_writer = CSV_Writer(csv_test_path, header=["a", "b"], delimiter=',')
+                csv_writer.write([["1", "2"], ["3", "4"]])
+                csv_writer.append_lines([["5", "6"]])
+                csv_writer.append_lines([["7", "8"]], locked=True)
+
+                with COMPRESSION_OPENERS[suffix](csv_test_path, 'rt') as file:
+                    self.assertEqual(file.readline(), "a,b\n")
+                self.assertEqual(len(csv_writer), 5)
+                self.assertEqual(count_file_lines(csv_test_path, strategy="mmap"), 6)
+                self.assertEqual(csv_writer.load_all(), [["1", "2"], ["3", "4"], ["5", "6"], ["7", "8"]])
+                self.assertEqual(list(csv_writer.iter_rows(start_index=2)), [["5", "6"], ["7", "8"]])
+                self.assertEqual(csv_writer.load_range(1, 3), [["3", "4"], ["5", "6"]])
+                self.assertEqual(csv_writer.load_numeric()[1], (4, 2))
+
+    def test_compressed_csv_without_byte_offsets(self):
+        with TestTeardownFile("test_compressed.csv.gz"):
+            with self.assertRaises(ValueError):
+                CSV_Writer("test_compressed.csv.gz", line_index="memory")
+
+            csv_writer = CSV_Writer("test_compressed.csv.gz", atomic=True)
+            csv_writer.save([["1", "2"], ["3", "4"]])
+            with self.assertRaises(ValueError):
+                csv_writer.remove_last_line()
+            self.assertEqual(csv_writer.load_all(workers=2), [["1", "2"], ["3", "4"]])
+
+    def test_compressed_append_counts_only_what_it_wrote(self):
+        with TestTeardownFile("test_compressed.csv.gz"):
+            csv_writer = CSV_Writer("test_compressed.csv.gz", header=("col1", "col2"))
+            csv_writer.append_lines([["1", "2"]])
+            self.assertEqual(len(csv_writer), 2)
+
+            with mock.patch("file_operations_mn.file_line_index.count_newlines") as count_newlines_mock:
+                csv_writer.append_lines([["3", "4"], ["5", "6"]])
+                self.assertEqual(len(csv_writer), 4)
+            count_newlines_mock.assert_not_called()
+
+            with gzip.open("test_compressed.csv.gz", 'ab') as file:
+                file.write(b"7|8\n")
+            csv_writer.append_lines([["9", "10"]])
+            self.assertEqual(len(csv_writer), 6)
+            self.assertEqual(csv_writer.load_all()[-2:], [["7", "8"], ["9", "10"]])
+
+    def test_json_and_text(self):
+        with TestTeardownFile("test_compressed.json.bz2"), TestTeardownFile("test_compressed.txt.xz"):
+            JSON_FileReader("test_compressed.json.bz2").save({"key": [1, 2]})
+            self.assertEqual(JSON_FileReader("test_compressed.json.bz2").load(), {"key": [1, 2]})
+
+            TXT_FileReader("test_compressed.txt.xz").save(["a\n", "b\n"])
+            self.assertEqual(TXT_FileReader("test_compressed.txt.xz").load(), "a\nb\n")
+            with open("test_compressed.txt.xz", 'rb') as file:
+                self.assertNotEqual(file.read(), b"a\nb\n")
+
+
+class TestDirectoryIndex(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.directory_path = self.directory.name
+        for file_name in ("1.txt", "3.txt", "test_file1.txt", "7.csv", "².txt"):
+            make_empty_file(os.path.join(self.directory_path, file_name))
+        os.makedirs(os.path.join(self.directory_path, "sub_dir1"))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_scandir_functions(self):
+        self.assertEqual(sorted(files_in_dir(self.directory_path)), ["1.txt", "3.txt", "test_file1.txt", "².txt"])
+        self.assertEqual(max_file_index_in_dir(self.directory_path), 3)
+        self.assertEqual(max_file_index_in_dir(self.directory_path, extension_type=".csv"), 7)
+        with self.assertRaises(InvalidPathError):
+            files_in_dir(self.directory_path, extension="txt")
+
+    def test_create_next_file_is_incremental(self):
+        directory_index = DirectoryIndex(self.directory_path)
+        self.assertEqual(directory_index.max_index(), 3)
+
+        file_path = directory_index.create_next_file()
+        self.assertEqual(file_path, os.path.join(self.directory_path, "4.txt"))
+        self.assertTrue(file_exists(file_path))
+        self.assertEqual(directory_index.max_index(), 4)
+        self.assertIn("4.txt", directory_index)
+
+    def test_outside_changes_trigger_rescan(self):
+        directory_index = DirectoryIndex(self.directory_path)
+        self.assertEqual(len(directory_index), 4)
+
+        make_empty_file(os.path.join(self.directory_path, "10.txt"))
+        # Force a different mtime, some filesystems only store it to the second.
+        os.utime(self.directory_path, ns=(0, 0))
+        self.assertEqual(directory_index.max_index(), 10)
+        self.assertEqual(sorted(directory_index.files()), sorted(files_in_dir(self.directory_path)))
+
+
+class TestWalkDir(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.directory_path = self.directory.name
+        self.file_paths = []
+        for relative_path in ("a.txt", "b.csv", "sub_dir1/c.txt", "sub_dir1/deep/d.txt", "sub_dir2/e.csv"):
+            file_path = os.path.join(self.directory_path, relative_path)
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            make_empty_file(file_path)
+            self.file_paths.append(file_path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_immediate_subdirs_is_one_level(self):
+        self.assertEqual(sorted(immediate_subdirs(self.directory_path)), ["sub_dir1", "sub_dir2"])
+
+    def test_walk_matches_os_walk(self):
+        expected = sorted(os.path.join(root, file_name) for root, _, file_names in os.walk(self.directory_path)
+                          for file_name in file_names)
+        self.assertEqual(sorted(walk_dir(self.directory_path)), expected)
+        self.assertEqual(sorted(walk_dir(self.directory_path, workers=4)), expected)
+
+    def test_depth_and_extension_filters(self):
+        for workers in (1, 3):
+            with self.subTest(workers=workers):
+                self.assertEqual(sorted(walk_dir(self.directory_path, max_depth=0, workers=workers)),
+                                 sorted(self.file_paths[:2]))
+                self.assertEqual(sorted(walk_dir(self.directory_path, max_depth=1, extension=".txt",
+                                                 workers=workers)),
+                                 sorted([self.file_paths[0], self.file_paths[2]]))
+        with self.assertRaises(NotADirectoryError):
+            next(walk_dir(self.file_paths[0]))
+
+
+class TestDiscoverFiles(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.directory_path = self.directory.name
+        self.sizes = {"small.csv": 10, "big.csv": 1000, "sub_dir/big.csv": 2000, "sub_dir/big.txt": 3000,
+                      "sub_dir/deep/old.csv": 4000}
+        for relative_path, size in self.sizes.items():
+            file_path = os.path.join(self.directory_path, relative_path)
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(file_path, 'wb') as file:
+                file.write(b'x' * size)
+        os.utime(os.path.join(self.directory_path, "sub_dir/deep/old.csv"), (1000, 1000))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def relative_paths(self, file_paths) -> list[str]:
+        return sorted(os.path.relpath(file_path, self.directory_path).replace(os.sep, '/')
+                      for file_path in file_paths)
+
+    def test_filters(self):
+        for workers in (1, 4):
+            with self.subTest(workers=workers):
+                self.assertEqual(self.relative_paths(discover_files(self.directory_path, extension=".csv",
+                                                                    min_size=1000, workers=workers)),
+                                 ["big.csv", "sub_dir/big.csv", "sub_dir/deep/old.csv"])
+                self.assertEqual(self.relative_paths(discover_files(self.directory_path, max_size=1000,
+                                                                    workers=workers)),
+                                 ["big.csv", "small.csv"])
+                self.assertEqual(self.relative_paths(discover_files(self.directory_path, modified_before=2000,
+                                                                    workers=workers)),
+                                 ["sub_dir/deep/old.csv"])
+                self.assertEqual(len(list(discover_files(self.directory_path, modified_after=2000,
+                                                         workers=workers))), 4)
+
+    def test_streams_before_the_walk_finishes(self):
+        scandir = os.scandir
+        for workers in (1, 2):
+            scanned = []
+
+            def recording_scandir(path):
+                scanned.append(self.relative_paths([path])[0])
+                return scandir(path)
+
+            with self.subTest(workers=workers), mock.patch.object(os, "scandir", recording_scandir):
+                file_paths = discover_files(self.directory_path, workers=workers)
+                self.assertIn(self.relative_paths([next(file_paths)])[0], ("big.csv", "small.csv"))
+                self.assertNotIn("sub_dir/deep", scanned)
+                file_paths.close()
+                self.assertEqual(scanned[0], ".")
+
+
+class TestPathInfo(unittest.TestCase):
+    def test_fields(self):
+        path_info = PathInfo(os.path.join("dir", "data.csv.gz"))
+        self.assertEqual(path_info.extension, ".csv")
+        self.assertEqual(path_info.compression, ".gz")
+        self.assertIsNone(PathInfo("data").extension)
+        self.assertIsNone(PathInfo(os.path.join("dir.d", "data")).extension)
+        with self.assertRaises(AttributeError):
+            path_info.other = 1
+
+    def test_extension_matches_is_path_of_extension(self):
+        for file_path in (os.path.join("a", ".csv"), "a.csv", ".csv", "a.csv.gz", os.path.join("a", ".csv.bz2")):
+            with self.subTest(file_path=file_path):
+                self.assertEqual(PathInfo(file_path).extension == ".csv",
+                                 is_path_of_extension(file_path_without_compression(file_path), ".csv"))
+
+    def test_text_writer_without_extension_raises(self):
+        with TestTeardownFile("test_path_info"):
+            text_writer = TextWriterSingleLine("test_path_info")
+            for call in (text_writer.load, lambda: text_writer.save("data")):
+                with self.assertRaises(InvalidPathError):
+                    call()
+
+    def test_file_reader_reparses_on_set(self):
+        with TestTeardownFile("test_path_info.txt"), TestTeardownFile("test_path_info.txt.bz2"):
+            text_writer = TextWriterSingleLine("test_path_info.txt")
+            self.assertEqual(text_writer.path_info.extension, ".txt")
+            self.assertIsNone(text_writer.path_info.compression)
+
+            text_writer.file_path = "test_path_info.txt.bz2"
+            self.assertEqual(text_writer.path_info.compression, ".bz2")
+            # A new compressed file starts out as 0 bytes, which bz2 alone can't read.
+            self.assertEqual(TextWriterSingleLine("test_path_info.txt.bz2").load(), "")
+            text_writer.save("compressed")
+            self.assertEqual(TextWriterSingleLine("test_path_info.txt.bz2").load(), "compressed")
+
+    def test_invalid_csv_path(self):
+        with self.assertRaises(AssertionError):
+            CSV_Writer("test_path_info.txt")
+
+    def test_free_functions_are_cached(self):
+        file_path_extension.cache_clear()
+        file_path_extension("test_cached.csv")
+        file_path_extension("test_cached.csv")
+        self.assertEqual(file_path_extension.cache_info().hits, 1)
+
+
 class DirectoryFunctions(unittest.TestCase):
     def test_list_files_in_test_directory_correct(self):
         file_paths = files_in_dir("test_directory")